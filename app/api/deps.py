@@ -0,0 +1,36 @@
+from functools import lru_cache
+from app.services.cad_processor import CADProcessor
+from app.services.image_processor import ImageProcessor
+from app.services.llama_processor import LLaMAProcessor
+from app.services.perplexity_client import PerplexityClient
+from app.services.voice_processor import VoiceProcessor
+
+# Service singletons are built on first use rather than at import, so a
+# worker only pays for the services its requests actually touch. Routes
+# receive them through Depends(); tests can swap them with
+# app.dependency_overrides.
+
+
+@lru_cache()
+def get_cad_processor() -> CADProcessor:
+    return CADProcessor()
+
+
+@lru_cache()
+def get_llama_processor() -> LLaMAProcessor:
+    return LLaMAProcessor()
+
+
+@lru_cache()
+def get_perplexity_client() -> PerplexityClient:
+    return PerplexityClient()
+
+
+@lru_cache()
+def get_voice_processor() -> VoiceProcessor:
+    return VoiceProcessor()
+
+
+@lru_cache()
+def get_image_processor() -> ImageProcessor:
+    return ImageProcessor()
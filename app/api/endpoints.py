@@ -1,196 +1,8 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import Dict, Any, List
-from datetime import datetime
-from pydantic import BaseModel, validator
-import asyncio
-import logging
-
-logger = logging.getLogger(__name__)
+from fastapi import APIRouter
+from app.api.routes import cad, input_handler, research
 
+# Mounted by app.main under /api/v1
 router = APIRouter()
-
-
-# Enhanced Models
-class CADRequest(BaseModel):
-    design_type: str
-    specifications: Dict[str, Any]
-    research_results: List[str] = []
-    project_id: str = None
-    version: str = "1.0"
-
-    @validator('design_type')
-    def validate_design_type(cls, v):
-        if v not in ["3D_MODEL", "2D_DRAWING", "ASSEMBLY", "PROTOTYPE"]:
-            raise ValueError("Invalid design type")
-        return v
-
-
-class ResearchQueryRequest(BaseModel):
-    query: str
-    context: Dict[str, Any] = {}
-    filters: Dict[str, Any] = {}
-
-
-class InputRequest(BaseModel):
-    input_type: str
-    data: str
-    metadata: Dict[str, Any] = {}
-
-
-# CAD Endpoints with Implementation
-@router.post("/cad/generate")
-async def generate_cad(cad_request: CADRequest) -> Dict[str, Any]:
-    """Generate CAD instructions"""
-    try:
-        # Process specifications
-        processed_specs = await process_specifications(cad_request.specifications)
-
-        # Generate instructions
-        instructions = await generate_instructions(
-            cad_request.design_type,
-            processed_specs,
-            cad_request.research_results
-        )
-
-        return {
-            "status": "success",
-            "instructions": instructions,
-            "metadata": {
-                "project_id": cad_request.project_id,
-                "version": cad_request.version,
-                "timestamp": datetime.now().isoformat()
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error generating CAD instructions: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post("/cad/validate")
-async def validate_cad(cad_request: CADRequest) -> Dict[str, Any]:
-    """Validate CAD design"""
-    try:
-        validation_results = await validate_design(
-            cad_request.design_type,
-            cad_request.specifications
-        )
-
-        return {
-            "is_valid": validation_results["is_valid"],
-            "validation_details": validation_results["details"],
-            "recommendations": validation_results["recommendations"],
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error validating CAD design: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-# Research Endpoints with Implementation
-@router.post("/research/query")
-async def research_query(research_query: ResearchQueryRequest) -> Dict[str, Any]:
-    """Perform research query"""
-    try:
-        results = await process_research_query(
-            research_query.query,
-            research_query.context,
-            research_query.filters
-        )
-
-        return {
-            "results": results,
-            "metadata": {
-                "timestamp": datetime.now().isoformat(),
-                "query_context": research_query.context
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error performing research query: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-# Input Processing Endpoints with Implementation
-@router.post("/input/image")
-async def process_image_input(
-        file: UploadFile = File(...),
-        metadata: Dict[str, Any] = {}
-) -> Dict[str, Any]:
-    """Process image input"""
-    try:
-        # Validate file
-        if not file.filename.lower().endswith(('.obj', '.stl', '.step', '.iges')):
-            raise ValueError("Unsupported file format")
-
-        # Process image
-        processed_result = await process_image_file(file, metadata)
-
-        return {
-            "status": "success",
-            "processed_data": processed_result,
-            "metadata": {
-                "filename": file.filename,
-                "timestamp": datetime.now().isoformat()
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error processing image input: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-# Helper Functions
-async def process_specifications(specs: Dict[str, Any]) -> Dict[str, Any]:
-    """Process specifications"""
-    if not specs.get("dimensions"):
-        raise ValueError("Dimensions are required")
-    if not specs.get("material"):
-        raise ValueError("Material specification is required")
-    return specs
-
-
-async def generate_instructions(
-        design_type: str,
-        specs: Dict[str, Any],
-        research_results: List[str]
-) -> List[str]:
-    """Generate instructions"""
-    instructions = []
-    if design_type == "3D_MODEL":
-        instructions.extend([
-            f"Create base with dimensions: {specs['dimensions']}",
-            f"Apply material: {specs['material']}"
-        ])
-    # Add more design type handling
-    return instructions
-
-
-async def validate_design(design_type: str, specs: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate design"""
-    return {
-        "is_valid": True,
-        "details": ["Design meets all requirements"],
-        "recommendations": ["Optional: Consider material optimization"]
-    }
-
-
-async def process_research_query(
-        query: str,
-        context: Dict[str, Any],
-        filters: Dict[str, Any]
-) -> List[Dict[str, Any]]:
-    """Process research query"""
-    return [
-        {
-            "content": "Research result 1",
-            "confidence": 0.95,
-            "source": "Database 1"
-        }
-    ]
-
-
-async def process_image_file(file: UploadFile, metadata: Dict[str, Any]) -> Dict[str, Any]:
-    """Process image file"""
-    return {
-        "processed": True,
-        "file_type": file.content_type,
-        "size": file.size
-    }
\ No newline at end of file
+router.include_router(cad.router)
+router.include_router(research.router)
+router.include_router(input_handler.router)
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from app.services.cad_processor import CADProcessor
-from app.models.cad_model import CADInstruction
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Dict, Any, Union
+import json
+from app.api.deps import get_cad_processor, get_llama_processor
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.responses import FastJSONResponse, cached_json_response, dumps
+from app.services.cad_batch import expand_sweep
+from app.services.cad_catalog import cad_catalog
+from app.services.cad_processor import CADProcessor, QueueFullError
+from app.services.cad_projects import ProjectConflictError, ProjectNotFoundError
+from app.services.llama_processor import LLaMAProcessor
+from app.services.storage import storage, CAD_INSTRUCTIONS
+from app.models.cad_model import CADInstruction, DesignType
 
 router = APIRouter(prefix="/cad", tags=["cad"])
 
@@ -15,10 +26,18 @@ class CADRequest(BaseModel):
     version: Optional[str] = "1.0"
     constraints: Optional[Dict[str, Any]] = None
 
+    @field_validator("design_type")
+    @classmethod
+    def validate_design_type(cls, v):
+        # None is only reachable on OptimizationRequest's legacy body
+        if v is not None and v not in {design_type.value for design_type in DesignType}:
+            raise ValueError("Invalid design type")
+        return v
+
     class Config:
         schema_extra = {
             "example": {
-                "design_type": "3D Model",
+                "design_type": "3D_MODEL",
                 "specifications": {
                     "dimensions": {"length": 100, "width": 50, "height": 25},
                     "material": "aluminum",
@@ -32,11 +51,86 @@ class CADRequest(BaseModel):
         }
 
 
-cad_processor = CADProcessor()
+DEFAULT_OBJECTIVES = {
+    "material_usage": True,
+    "structural_integrity": True,
+    "manufacturing_cost": True
+}
+
+
+class CADJobRequest(CADRequest):
+    priority: str = Field("normal", pattern="^(high|normal|low)$")
+    optimize: bool = False
+    objectives: Dict[str, bool] = Field(
+        default_factory=lambda: dict(DEFAULT_OBJECTIVES),
+        description="Optimization objectives when optimize is set, as for /optimize"
+    )
+
+
+class SweepRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(..., gt=0)
+
+
+class CADBatchRequest(BaseModel):
+    design_type: str
+    specifications: dict = Field(..., description="Base specification shared by all variants")
+    variants: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Flat field overrides per variant, e.g. {\"length\": 120, \"material\": \"steel\"}"
+    )
+    sweep: Optional[Dict[str, Union[SweepRange, List[Any]]]] = Field(
+        None,
+        description="Axes whose cartesian product is appended to the variants"
+    )
+    research_results: Optional[List[str]] = None
+    stream: bool = Field(
+        True,
+        description="Stream results as NDJSON in variant order; batches over "
+                    "CAD_BATCH_MAX_BUFFERED_VARIANTS are always streamed"
+    )
+
+
+class CADProjectRequest(BaseModel):
+    design_type: str
+    specifications: dict
+    research_results: Optional[List[str]] = None
+    base_version: Optional[int] = Field(None, ge=1, description="Version to diff against; defaults to the latest")
+    include_instructions: bool = Field(False, description="Also return the full instruction list")
+
+
+class OptimizationRequest(CADRequest):
+    # Optional so the legacy {instructions, parameters} body still validates
+    design_type: Optional[str] = None
+    specifications: Optional[dict] = None
+    objectives: Dict[str, bool] = Field(
+        default_factory=lambda: dict(DEFAULT_OBJECTIVES),
+        description="material_usage and manufacturing_cost weight the objective; "
+                    "structural_integrity keeps strength at least at the original level"
+    )
+    time_budget: Optional[float] = Field(
+        None, gt=0, le=30, description="Seconds before the best design so far is returned"
+    )
+    instructions: Optional[List[str]] = Field(
+        None, description="Legacy contract: instructions to return unchanged when no specifications are sent"
+    )
+    parameters: Optional[Dict[str, bool]] = Field(None, description="Legacy alias of objectives")
+
+
+class AnalysisRequest(BaseModel):
+    text: str = Field(..., min_length=1, description="CAD design requirements")
+    detailed: bool = False
+    use_cache: bool = Field(
+        True, description="Replay the cached analysis of an identical earlier request"
+    )
 
 
 @router.post("/generate", response_model=CADInstruction)
-async def generate_cad_instructions(request: CADRequest):
+async def generate_cad_instructions(
+        request: CADRequest,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
     try:
         #Adding input validation so to be sure that their is valid input.
 
@@ -58,33 +152,249 @@ async def generate_cad_instructions(request: CADRequest):
                 status_code=422,
                 detail=f"Design is not feasible: {verification.reason}"
             )
-        return CADInstruction(
+        cad_instruction = CADInstruction(
             design_type=request.design_type,
             instructions=instructions,
+            project_name=request.project_id,
             metadata={
                 "project_id": request.project_id,
                 "version": request.version,
                 "verification_status": verification.status
             }
         )
+        storage.save(CAD_INSTRUCTIONS, cad_instruction.model_dump())
+        return FastJSONResponse(cad_instruction)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def generate_cad_batch(
+        request: CADBatchRequest,
+        http_request: Request,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    if not request.specifications:
+        raise HTTPException(status_code=400, detail="Specifications are required")
+    if not cad_processor.rule_engine.supports(request.design_type):
+        raise HTTPException(status_code=400, detail=f"Unsupported design type: {request.design_type}")
+
+    variants = list(request.variants or [])
+    try:
+        if request.sweep:
+            variants.extend(expand_sweep(
+                {field: axis.model_dump() if isinstance(axis, SweepRange) else axis
+                 for field, axis in request.sweep.items()},
+                # Explicit variants count against the same limit
+                max_variants=settings.CAD_BATCH_MAX_VARIANTS - len(variants)
+            ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not variants:
+        raise HTTPException(status_code=400, detail="Provide variants or a sweep")
+    if len(variants) > settings.CAD_BATCH_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds {settings.CAD_BATCH_MAX_VARIANTS} variants"
+        )
+    await rate_limiter.charge_items(http_request, len(variants))
+
+    results = cad_processor.generate_batch(
+        design_type=request.design_type,
+        specifications=request.specifications,
+        variants=variants,
+        research_results=request.research_results
+    )
+
+    # Large batches are never collected into one response body
+    if request.stream or len(variants) > settings.CAD_BATCH_MAX_BUFFERED_VARIANTS:
+        async def ndjson_stream():
+            async for item in results:
+                yield dumps(item) + b"\n"
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    try:
+        items = [item async for item in results]
+        succeeded = sum(1 for item in items if item["status"] == "success")
+        return {"results": items, "succeeded": succeeded, "failed": len(items) - succeeded}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/projects/{project_id}/generate")
+async def generate_project_version(
+        project_id: str,
+        request: CADProjectRequest,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    if not request.specifications:
+        raise HTTPException(status_code=400, detail="Specifications are required")
+
+    try:
+        result = await cad_processor.generate_incremental(
+            project_id=project_id,
+            design_type=request.design_type,
+            specifications=request.specifications,
+            research_results=request.research_results,
+            base_version=request.base_version
+        )
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ProjectConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    state = result.pop("state")
+    if request.include_instructions:
+        result["instructions"] = state.instructions
+    return result
+
+
+@router.get("/projects/{project_id}")
+async def get_project(
+        project_id: str,
+        version: Optional[int] = Query(None, ge=1),
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    state = await cad_processor.projects.get(project_id, version)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    return state.to_dict()
+
+
+@router.get("/instructions")
+async def list_cad_instructions(
+        project_name: Optional[str] = None,
+        limit: int = Query(20, ge=1, le=100),
+        skip: int = Query(0, ge=0)
+):
+    try:
+        query = {"project_name": project_name} if project_name else {}
+        # Summaries only; the instruction lists stay in the database
+        items = await storage.find_many(
+            CAD_INSTRUCTIONS,
+            query,
+            projection={
+                "design_type": 1,
+                "project_name": 1,
+                "created_at": 1,
+                "status": 1,
+                "version": 1,
+                "metadata.version": 1
+            },
+            limit=limit,
+            skip=skip
+        )
+        return {"items": items, "count": len(items), "skip": skip, "limit": limit}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+@router.post("/jobs", status_code=202)
+async def submit_cad_job(
+        request: CADJobRequest,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    if not request.specifications:
+        raise HTTPException(status_code=400, detail="Specifications are required")
+    if request.optimize:
+        try:
+            cad_processor.validate_optimization(request.specifications, request.constraints)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        job = cad_processor.submit_job(
+            request=request.model_dump(exclude={"priority"}),
+            priority=request.priority
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        **job.to_dict(),
+        "status_url": f"{router.prefix}/jobs/{job.job_id}",
+        "result_url": f"{router.prefix}/jobs/{job.job_id}/result"
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_cad_job(
+        job_id: str,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    job = await cad_processor.lookup_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result", response_model=CADInstruction)
+async def get_cad_job_result(
+        job_id: str,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    job = await cad_processor.lookup_job(job_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} failed: {job['error']}")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+    return job["result"]
+
+
+@router.post("/analyze/stream")
+async def stream_requirements_analysis(
+        request: AnalysisRequest,
+        llama_processor: LLaMAProcessor = Depends(get_llama_processor)
+):
+    # Server-Sent Events: one "token" event per chunk, then the final "analysis"
+    async def event_stream():
+        try:
+            async for event, data in llama_processor.stream_cad_requirements(
+                    text=request.text,
+                    detailed=request.detailed,
+                    use_cache=request.use_cache
+            ):
+                payload = {"text": data} if event == "token" else data
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.post("/validate")
-async def validate_design(instruction: CADInstruction):
+async def validate_design(
+        instruction: CADInstruction,
+        validation_level: str = Query("DETAILED", pattern="^(QUICK|STANDARD|DETAILED)$"),
+        fail_fast: Optional[bool] = None,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
     try:
-        # Implementing Comprehensive Validation
         validation_result = await cad_processor.validate_instructions(
             instruction.instructions,
-            validate_level="DETAILED"
+            validation_level=validation_level,
+            fail_fast=fail_fast
         )
         return {
             "is_valid": validation_result.is_valid,
             "validation_details": validation_result.details,
             "recommendations": validation_result.recommendations,
-            "performance_metrics": validation_result.performance_metrics
+            "metrics": validation_result.metrics
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,89 +402,100 @@ async def validate_design(instruction: CADInstruction):
 
 @router.get("/templates/{design_type}")
 async def get_design_templates(
+        request: Request,
         design_type: str,
         complexity: Optional[str] = "medium",
         scale: Optional[str] = "standard"
 ):
-    try:
-        templates = {
-            "3D_MODEL": {
-                "basic": {
-                    "template_id": "3d_basic_001",
-                    "dimensions": {"length": 100, "width": 50, "height": 25},
-                    "default_material": "aluminum",
-                    "standard_tolerances": "±0.1mm"
-                },
-                "advanced": {
-                    "template_id": "3d_adv_001",
-                    "parametric_rules": True,
-                    "assembly_support": True
-                }
-            }
-        }
-
-        if design_type not in templates:
+    entry = cad_catalog.templates(design_type, complexity, scale)
+    if entry is None:
+        if design_type not in cad_catalog.design_types:
             raise HTTPException(
                 status_code=404,
                 detail=f"No templates found for design type: {design_type}"
             )
-
-        return templates[design_type]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(
+            status_code=400,
+            detail=f"complexity must be one of {list(cad_catalog.complexities)} "
+                   f"and scale one of {list(cad_catalog.scales)}"
+        )
+    return cached_json_response(request, entry.body, entry.etag, settings.CAD_CATALOG_MAX_AGE)
 
 
 @router.post("/optimize")
-async def optimize_design(instruction: CADInstruction):
-    try:
-        optimization_params = {
-            "material_usage": True,
-            "structural_integrity": True,
-            "manufacturing_cost": True,
-            "production_time": True
-        }
+async def optimize_design(
+        request: OptimizationRequest,
+        cad_processor: CADProcessor = Depends(get_cad_processor)
+):
+    objectives = request.objectives
+    if request.parameters is not None and "objectives" not in request.model_fields_set:
+        objectives = request.parameters
 
-        optimized_design = await cad_processor.optimize_design(
-            instructions=instruction.instructions,
-            parameters=optimization_params
+    if not request.specifications:
+        if request.instructions is None:
+            raise HTTPException(status_code=400, detail="Specifications are required")
+        # Legacy {instructions, parameters} body: without specifications there
+        # is nothing to optimize, so the instructions come back unchanged
+        optimized = await cad_processor.optimize_design(
+            instructions=request.instructions,
+            parameters=objectives,
+            design_type=request.design_type
         )
-
         return {
-            "original_design": instruction,
-            "optimized_design": optimized_design,
-            "optimization_metrics": {
-                "material_saved": "15%",
-                "strength_improved": "25%",
-                "cost_reduced": "20%"
-            }
+            "original_design": {"instructions": request.instructions},
+            "optimized_design": {"instructions": optimized["instructions"]},
+            "optimization_metrics": optimized["metrics"]
         }
+
+    if not request.design_type:
+        raise HTTPException(status_code=400, detail="design_type is required with specifications")
+
+    try:
+        cad_processor.validate_optimization(request.specifications, request.constraints)
+        instructions = await cad_processor.generate_instructions(
+            design_type=request.design_type,
+            specifications=request.specifications,
+            research_results=request.research_results
+        )
+        optimized = await cad_processor.optimize_design(
+            instructions=instructions,
+            parameters=objectives,
+            design_type=request.design_type,
+            specifications=request.specifications,
+            constraints=request.constraints,
+            research_results=request.research_results,
+            time_budget=request.time_budget
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "original_design": {
+            "specifications": request.specifications,
+            "instructions": instructions,
+            "properties": optimized.get("original")
+        },
+        "optimized_design": {
+            "specifications": optimized["specifications"],
+            "instructions": optimized["instructions"],
+            "properties": optimized.get("optimized")
+        },
+        "optimization_metrics": optimized["metrics"]
+    }
+
 
 @router.get("/compatibility")
 async def check_compatibility(
+        request: Request,
         format: str,
         version: Optional[str] = None
 ):
-    try:
-        compatibility_matrix = {
-            "obj": {"versions": ["2.0", "3.0"], "export_support": True},
-            "stl": {"versions": ["ascii", "binary"], "export_support": True},
-            "step": {"versions": ["AP203", "AP214"], "export_support": True},
-            "iges": {"versions": ["5.3", "6.0"], "export_support": True}
-        }
-
-        if format not in compatibility_matrix:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Format {format} not supported"
-            )
-
-        return {
-            "format": format,
-            "compatibility": compatibility_matrix[format],
-            "recommended_version": compatibility_matrix[format]["versions"][-1]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    entry = cad_catalog.compatibility(format)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Format {format} not supported"
+        )
+    return cached_json_response(request, entry.body, entry.etag, settings.CAD_CATALOG_MAX_AGE)
@@ -1,12 +1,17 @@
 from datetime import datetime
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Response
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
+from app.api.deps import get_image_processor, get_voice_processor
+from app.core.config import settings
+from app.core.metrics import StageTimer
 from app.services.voice_processor import VoiceProcessor
 from app.models.nlp_model import ProcessedInput
 from app.services.image_processor import ImageProcessor
-image_processor = ImageProcessor()
+from app.services.storage import storage, PROCESSED_INPUTS
+from app.utils.helpers import Helper
+from app.utils.uploads import UploadRejected, read_upload
 
 router = APIRouter(prefix="/input", tags=["input"])
 
@@ -39,32 +44,67 @@ class InputResponse(BaseModel):
     processed_at: datetime
     status: str
     project_name: Optional[str] = None
+    processing_duration: float = 0.0
+
+
+def _store_input(
+        processed_input: ProcessedInput,
+        timer: StageTimer,
+        response: Response
+) -> InputResponse:
+    with timer.stage("post_process"):
+        input_id = Helper.generate_unique_id("input")
+        input_response = InputResponse(
+            input_id=input_id,
+            input_type=processed_input.input_type.value,
+            content=processed_input.content,
+            processed_at=processed_input.processed_at,
+            status="processed",
+            project_name=processed_input.project_name
+        )
 
-
-voice_processor = VoiceProcessor()
+    # Taken after post-processing so the duration and the Server-Timing total cover every stage
+    total = timer.elapsed()
+    processed_input.processing_duration = total
+    input_response.processing_duration = total
+    storage.save(PROCESSED_INPUTS, {
+        "input_id": input_id,
+        "created_at": processed_input.processed_at,
+        **processed_input.model_dump()
+    })
+    response.headers["Server-Timing"] = timer.server_timing(total)
+    return input_response
 
 
 @router.post("/text", response_model=InputResponse)
-async def process_text_input(request: TextRequest):
+async def process_text_input(request: TextRequest, response: Response):
+    timer = StageTimer()
     try:
-        processed_input = ProcessedInput(
-            input_type="text",
-            content=request.content,
-            project_name=request.project_name,
-            metadata=request.metadata
-        )
-        return processed_input
+        with timer.stage("validate"):
+            processed_input = ProcessedInput(
+                input_type="text",
+                content=request.content,
+                project_name=request.project_name,
+                metadata=request.metadata
+            )
+        return _store_input(processed_input, timer, response)
     except Exception as e:
-        status_code = 500
-        detail = f"Text processing error: {str(e)}"
+        raise HTTPException(
+            status_code=500,
+            detail=f"Text processing error: {str(e)}"
+        )
 
 
 @router.post("/voice", response_model=InputResponse)
 async def process_voice_input(
+        response: Response,
         file: UploadFile = File(...),
         project_name: Optional[str] = None,
-        language: Optional[str] = "en"
+        language: Optional[str] = "en",
+        voice_processor: VoiceProcessor = Depends(get_voice_processor)
 ):
+    timer = StageTimer()
+    upload = None
     try:
         if not file.content_type.startswith('audio/'):
             raise HTTPException(
@@ -72,30 +112,58 @@ async def process_voice_input(
                 detail="File must be an audio format"
             )
 
-        content = await voice_processor.transcribe(
-            audio_data=await file.read(),
+        # Stream the upload in chunks so oversized or non-audio files are rejected early
+        with timer.stage("read"):
+            upload = await read_upload(
+                file,
+                max_size=min(settings.MAX_UPLOAD_SIZE, voice_processor.max_file_size),
+                allowed_formats=voice_processor.supported_formats,
+                spool_threshold=settings.VOICE_SPOOL_THRESHOLD
+            )
+
+        transcription = await voice_processor.transcribe(
+            audio_data=upload.source,
             language=language
         )
+        for stage, duration in transcription["timings"].items():
+            timer.add(stage, duration)
 
-        return ProcessedInput(
+        return _store_input(ProcessedInput(
             input_type="voice",
-            content=content,
+            content=transcription["text"] or "",
             project_name=project_name,
-            metadata={"original_filename": file.filename}
-        )
+            language=language,
+            confidence_score=transcription["confidence"] or 0.0,
+            metadata={
+                "original_filename": file.filename,
+                "audio_format": upload.file_format,
+                "audio_info": transcription["audio_info"]
+            }
+        ), timer, response)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Voice processing error: {str(e)}"
         )
+    finally:
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/image", response_model=InputResponse)
 async def process_image_input(
+        response: Response,
         file: UploadFile = File(...),
         project_name: Optional[str] = None,
-        analysis_type: Optional[str] = "basic"
+        analysis_type: Optional[str] = "basic",
+        image_processor: ImageProcessor = Depends(get_image_processor)
 ):
+    timer = StageTimer()
+    upload = None
     try:
         if not file.content_type.startswith('image/'):
             raise HTTPException(
@@ -103,12 +171,27 @@ async def process_image_input(
                 detail="File must be an image format"
             )
 
-        image_analysis = await image_processor.analyze(
-            image_data=await file.read(),
-            analysis_type=analysis_type
-        )
+        if analysis_type not in image_processor.analysis_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"analysis_type must be one of {image_processor.analysis_types}"
+            )
 
-        return ProcessedInput(
+        # Stream the upload in chunks so oversized or non-image files are rejected early
+        with timer.stage("read"):
+            upload = await read_upload(
+                file,
+                max_size=settings.MAX_UPLOAD_SIZE,
+                allowed_formats=settings.ALLOWED_IMAGE_FORMATS
+            )
+
+        with timer.stage("analyze"):
+            image_analysis = await image_processor.analyze(
+                image_data=upload.source,
+                analysis_type=analysis_type
+            )
+
+        return _store_input(ProcessedInput(
             input_type="image",
             content=image_analysis.description,
             project_name=project_name,
@@ -117,9 +200,16 @@ async def process_image_input(
                 "analysis_type": analysis_type,
                 "image_metadata": image_analysis.metadata
             }
-        )
+        ), timer, response)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Image processing error: {str(e)}"
         )
+    finally:
+        if upload is not None:
+            upload.close()
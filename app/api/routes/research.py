@@ -1,9 +1,16 @@
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, List
+import asyncio
+from app.api.deps import get_perplexity_client
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.responses import FastJSONResponse
 from app.services.perplexity_client import PerplexityClient
+from app.services.storage import storage, RESEARCH_RESULTS
 from app.models.research_model import ResearchResult
 
 router = APIRouter(prefix="/research", tags=["research"])
@@ -13,11 +20,26 @@ class ResearchRequest(BaseModel):
     query: str = Field(..., description="Research query string")
     context: Optional[str] = Field(None, description="Additional context for the research")
     max_results: Optional[int] = Field(5, ge=1, le=50)
+    project_name: Optional[str] = None
     filter: Optional[Dict[str, Any]] = Field(
         default_factory=dict,
         description="Search filters"
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def accept_legacy_body(cls, data):
+        # The original /research/query body sent "filters" and a context object
+        if isinstance(data, dict) and ("filters" in data or isinstance(data.get("context"), dict)):
+            data = dict(data)
+            filters = data.pop("filters", None)
+            if filters and not data.get("filter"):
+                data["filter"] = filters
+            if isinstance(data.get("context"), dict):
+                context = data["context"]
+                data["context"] = "; ".join(f"{key}: {value}" for key, value in context.items()) or None
+        return data
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -33,34 +55,84 @@ class ResearchRequest(BaseModel):
         }
 
 
-perplexity_client = PerplexityClient()
+class ResearchBatchRequest(BaseModel):
+    requests: List[ResearchRequest] = Field(..., min_length=1)
+    max_concurrency: Optional[int] = Field(None, ge=1, le=50)
+    stream: bool = Field(False, description="Stream results as NDJSON in completion order")
 
 
-@router.post("/query", response_model=ResearchResult)
-async def perform_research(request: ResearchRequest):
-    try:
-        # Validating whether the query is valid
-        if len(request.query.strip()) < 3:
-            raise HTTPException(
-                status_code=400,
-                detail="Query must be at least 3 characters long"
-            )
-
-        research_results = await perplexity_client.research_query(
-            query=request.query,
-            max_results=request.max_results,
-            context=request.context,
-            filter=request.filter
+class ResearchBatchItem(BaseModel):
+    index: int
+    status: str
+    result: Optional[ResearchResult] = None
+    error: Optional[str] = None
+
+
+class ResearchBatchResponse(BaseModel):
+    results: List[ResearchBatchItem]
+    succeeded: int
+    failed: int
+
+
+async def _run_research(
+        request: ResearchRequest,
+        perplexity_client: PerplexityClient
+) -> ResearchResult:
+    # Validating whether the query is valid
+    if len(request.query.strip()) < 3:
+        raise HTTPException(
+            status_code=400,
+            detail="Query must be at least 3 characters long"
         )
-        return ResearchResult(
-            query=request.query,
-            results=research_results,
-            metadata={
+
+    research_results = await perplexity_client.research_query(
+        query=request.query,
+        max_results=request.max_results,
+        context=request.context,
+        filters=request.filter
+    )
+    # The result may be shared with coalesced concurrent requests, so copy before annotating
+    result = research_results.model_copy(
+        update={
+            "project_name": request.project_name,
+            "metadata": {
+                **research_results.metadata,
                 "timestamp": datetime.now(),
                 "filters_applied": request.filter,
-                "result_count": len(research_results)
+                "result_count": len(research_results.results)
             }
-        )
+        }
+    )
+    storage.save(RESEARCH_RESULTS, result.model_dump())
+    return result
+
+
+async def _run_batch_item(
+        index: int,
+        request: ResearchRequest,
+        semaphore: asyncio.Semaphore,
+        perplexity_client: PerplexityClient
+) -> ResearchBatchItem:
+    async with semaphore:
+        try:
+            result = await _run_research(request, perplexity_client)
+            return ResearchBatchItem(index=index, status="success", result=result)
+        except HTTPException as e:
+            return ResearchBatchItem(index=index, status="error", error=str(e.detail))
+        except Exception as e:
+            return ResearchBatchItem(index=index, status="error", error=str(e))
+
+
+@router.post("/query", response_model=ResearchResult)
+async def perform_research(
+        request: ResearchRequest,
+        perplexity_client: PerplexityClient = Depends(get_perplexity_client)
+):
+    try:
+        # Already a ResearchResult, so skip response_model revalidation
+        return FastJSONResponse(await _run_research(request, perplexity_client))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -68,8 +140,94 @@ async def perform_research(request: ResearchRequest):
         )
 
 
+@router.post("/batch", response_model=ResearchBatchResponse)
+async def perform_batch_research(
+        batch: ResearchBatchRequest,
+        http_request: Request,
+        perplexity_client: PerplexityClient = Depends(get_perplexity_client)
+):
+    if len(batch.requests) > settings.RESEARCH_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size exceeds {settings.RESEARCH_BATCH_MAX_SIZE} queries"
+        )
+    await rate_limiter.charge_items(http_request, len(batch.requests))
+
+    concurrency = min(
+        batch.max_concurrency or settings.RESEARCH_BATCH_CONCURRENCY,
+        settings.RESEARCH_BATCH_CONCURRENCY
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    if batch.stream:
+        async def ndjson_stream():
+            tasks = [
+                asyncio.ensure_future(_run_batch_item(index, request, semaphore, perplexity_client))
+                for index, request in enumerate(batch.requests)
+            ]
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    item = await completed
+                    yield item.model_dump_json() + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    try:
+        items = await asyncio.gather(*(
+            _run_batch_item(index, request, semaphore, perplexity_client)
+            for index, request in enumerate(batch.requests)
+        ))
+        succeeded = sum(1 for item in items if item.status == "success")
+        return FastJSONResponse(ResearchBatchResponse(
+            results=items,
+            succeeded=succeeded,
+            failed=len(items) - succeeded
+        ))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch research error: {str(e)}"
+        )
+
+
+@router.get("/history")
+async def list_research_history(
+        project_name: Optional[str] = None,
+        limit: int = Query(20, ge=1, le=100),
+        skip: int = Query(0, ge=0)
+):
+    try:
+        query = {"project_name": project_name} if project_name else {}
+        # Summaries only; source contents stay in the database
+        items = await storage.find_many(
+            RESEARCH_RESULTS,
+            query,
+            projection={
+                "query": 1,
+                "project_name": 1,
+                "created_at": 1,
+                "keywords": 1,
+                "metadata.result_count": 1
+            },
+            limit=limit,
+            skip=skip
+        )
+        return {"items": items, "count": len(items), "skip": skip, "limit": limit}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Research history error: {str(e)}"
+        )
+
+
 @router.post("/analyze", response_model=Dict[str, Any])
-async def analyze_research(research_result: ResearchResult):
+async def analyze_research(
+        research_result: ResearchResult,
+        perplexity_client: PerplexityClient = Depends(get_perplexity_client)
+):
     try:
 
         analyzed_data = await perplexity_client.analyze_results(
@@ -89,7 +247,9 @@ async def analyze_research(research_result: ResearchResult):
 
 
 @router.get("/trending")
-async def get_trending_topics():
+async def get_trending_topics(
+        perplexity_client: PerplexityClient = Depends(get_perplexity_client)
+):
     try:
         trending = await perplexity_client.get_trending_topics()
         return {
@@ -104,7 +264,10 @@ async def get_trending_topics():
 
 
 @router.post("/summarize")
-async def summarize_research(research_result: ResearchResult):
+async def summarize_research(
+        research_result: ResearchResult,
+        perplexity_client: PerplexityClient = Depends(get_perplexity_client)
+):
     try:
         summary = await perplexity_client.generate_summary(
             research_result.results
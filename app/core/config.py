@@ -18,11 +18,21 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str
     DATABASE_NAME: str = "nlp_cad_db"
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 5
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    STORAGE_FLUSH_SIZE: int = 100
+    STORAGE_FLUSH_INTERVAL: float = 1.0
+    STORAGE_MAX_BUFFER: int = 10000
 
     # Security
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 2
 
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = [
@@ -38,10 +48,67 @@ class Settings(BaseSettings):
     ALLOWED_UPLOAD_EXTENSIONS: List[str] = [
         "wav", "mp3", "ogg", "obj", "stl"
     ]
+    ALLOWED_IMAGE_FORMATS: List[str] = [
+        "png", "jpeg", "gif", "webp", "bmp", "tiff"
+    ]
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024  # 64KB
+    UPLOAD_SPOOL_THRESHOLD: int = 8 * 1024 * 1024  # 8MB
+    # Voice uploads are decoded in the CPU executor; above this size they
+    # are handed over by path instead of being pickled into the worker
+    VOICE_SPOOL_THRESHOLD: int = 1024 * 1024  # 1MB
+    UPLOAD_SPOOL_DIR: Optional[str] = None
 
     # Cache Settings
     CACHE_TTL: int = 3600
     CACHE_PREFIX: str = "nlp_cad"
+    REDIS_URL: Optional[str] = None
+    LLAMA_CACHE_MAX_ENTRIES: int = 1024
+    LLAMA_CACHE_LOCAL_TTL: int = 300
+    LLAMA_CACHE_MAX_TEMPERATURE: float = 0.0
+
+    # Research Settings
+    RESEARCH_BATCH_MAX_SIZE: int = 100
+    RESEARCH_BATCH_CONCURRENCY: int = 8
+
+    # CAD Job Settings
+    CAD_JOB_WORKERS: int = 4
+    CAD_JOB_QUEUE_SIZE: int = 1000
+    CAD_JOB_RESULT_TTL: int = 3600
+    CAD_JOB_SHUTDOWN_TIMEOUT: float = 30.0
+    CAD_RULE_CACHE_MAX_ENTRIES: int = 4096
+    # Batches run in the request coroutine, so keep them small
+    CAD_BATCH_MAX_VARIANTS: int = 500
+    CAD_BATCH_MAX_BUFFERED_VARIANTS: int = 100  # Larger batches are always streamed
+    CAD_BATCH_CHUNK_SIZE: int = 50  # Variants between yields to the event loop
+    CAD_CATALOG_PATH: Optional[str] = None  # Defaults to app/data/cad_catalog.json
+    CAD_CATALOG_MAX_AGE: int = 300
+    CAD_OPTIMIZER_TIME_BUDGET: float = 2.0  # Seconds; the best design so far is returned when exceeded
+    CAD_OPTIMIZER_MAX_ITERATIONS: int = 25
+    CAD_OPTIMIZER_BATCH_SIZE: int = 256
+    CAD_OPTIMIZER_MAX_DIMENSION_CHANGE: float = 0.1
+    CAD_OPTIMIZER_MAX_INFLIGHT_BATCHES: Optional[int] = None  # Defaults to half the CPU executor workers
+    CAD_PROJECT_MAX_PROJECTS: int = 1000
+    CAD_PROJECT_MAX_VERSIONS: int = 20
+    CAD_RESEARCH_CACHE_MAX_ENTRIES: int = 4096
+
+    # CPU Executor Settings
+    CPU_EXECUTOR_ENABLED: bool = True
+    CPU_EXECUTOR_WORKERS: Optional[int] = None  # Defaults to the CPU count
+
+    # HTTP Client Pool Settings
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 60.0
+    HTTP_TOTAL_TIMEOUT: float = 120.0
+
+    # Lifespan Settings
+    STARTUP_WARMUP_ENABLED: bool = True
+    STARTUP_WARMUP_URLS: List[str] = []  # e.g. local stubs or upstream base URLs
+    STARTUP_WARMUP_TIMEOUT: float = 5.0
+    SHUTDOWN_TIMEOUT: float = 45.0  # Overall deadline for draining jobs and flushing writes
 
     class Config:
         env_file = ".env"
@@ -57,4 +124,11 @@ def get_settings() -> Settings:
     return Settings()
 
 
-settings = get_settings()
+class _LazySettings:
+    """Proxy that builds Settings (and reads .env) on first attribute access."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
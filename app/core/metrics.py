@@ -0,0 +1,250 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import time
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 50 * 1024 ** 2, 100 * 1024 ** 2)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = [[0] * (len(self.buckets) + 1), 0.0]
+            self._values[key] = entry
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self, namespace: str = "nlp_cad"):
+        self.namespace = namespace
+        self._metrics: Dict[str, Any] = {}
+        self._gauge_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        name = f"{self.namespace}_{name}"
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, description)
+        return self._metrics[name]
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        name = f"{self.namespace}_{name}"
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, description, buckets)
+        return self._metrics[name]
+
+    def register_gauges(self, prefix: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        # Numeric leaves of the collector's (nested) dict become gauges at scrape time
+        self._gauge_collectors[prefix] = collector
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, collector in self._gauge_collectors.items():
+            for name, value in self._flatten(f"{self.namespace}_{prefix}", collector()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _flatten(self, prefix: str, values: Dict[str, Any]):
+        for key, value in values.items():
+            name = f"{prefix}_{key}".replace("-", "_").replace(".", "_")
+            if isinstance(value, dict):
+                yield from self._flatten(name, value)
+            elif isinstance(value, bool):
+                yield name, int(value)
+            elif isinstance(value, (int, float)):
+                yield name, value
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route"
+)
+HTTP_REQUESTS = registry.counter("http_requests_total", "HTTP requests by route and status")
+HTTP_PAYLOAD_SIZE = registry.histogram(
+    "http_payload_size_bytes", "HTTP request and response body sizes", SIZE_BUCKETS
+)
+STAGE_DURATION = registry.histogram(
+    "stage_duration_seconds", "Time spent in each service processing stage"
+)
+UPSTREAM_DURATION = registry.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to upstream APIs"
+)
+PAYLOAD_SIZE = registry.histogram(
+    "payload_size_bytes", "Sizes of payloads handled by services", SIZE_BUCKETS
+)
+ERRORS = registry.counter("errors_total", "Errors by component and stage")
+
+
+class Span:
+    """Times a block into STAGE_DURATION and counts failures into ERRORS.
+
+    Usable as both `with span(...)` and `async with span(...)`.
+    """
+
+    def __init__(self, component: str, stage: str, histogram: Histogram = STAGE_DURATION, **labels: Any):
+        self.component = component
+        self.stage = stage
+        self.histogram = histogram
+        self.labels = labels
+        self.started: float = 0.0
+        self.duration: float = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self.started
+        self.histogram.observe(self.duration, component=self.component, stage=self.stage, **self.labels)
+        if exc_type is not None:
+            ERRORS.inc(component=self.component, stage=self.stage)
+
+    async def __aenter__(self) -> "Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+def span(component: str, stage: str) -> Span:
+    return Span(component, stage)
+
+
+def upstream_span(service: str, operation: str) -> Span:
+    return Span(service, operation, histogram=UPSTREAM_DURATION)
+
+
+def record_payload(component: str, kind: str, size: int) -> None:
+    PAYLOAD_SIZE.observe(size, component=component, kind=kind)
+
+
+class StageTimer:
+    """Per-request stage timings on the monotonic clock, exposed as Server-Timing."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def add(self, name: str, duration: float) -> None:
+        self.stages.append((name, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        entries = [f"{name};dur={duration * 1000:.2f}" for name, duration in self.stages]
+        entries.append(f"total;dur={(self.elapsed() if total is None else total) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and body sizes per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500, "response_size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                status["response_size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Label by route template rather than raw path to bound cardinality
+            route_path = getattr(route, "path", "unmatched")
+            labels = {"method": scope["method"], "route": route_path}
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, **labels)
+            HTTP_REQUESTS.inc(status=status["code"], **labels)
+
+            headers = dict(scope.get("headers") or [])
+            request_size = headers.get(b"content-length")
+            if request_size and request_size.isdigit():
+                HTTP_PAYLOAD_SIZE.observe(int(request_size), direction="request", **labels)
+            HTTP_PAYLOAD_SIZE.observe(status["response_size"], direction="response", **labels)
@@ -0,0 +1,279 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import time
+from fastapi import HTTPException, Request
+from app.core.config import settings
+from app.core.security import SecurityHandler
+from app.core.settings import APISettings
+from app.services.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+api_settings = APISettings()
+
+# Token bucket refill and charge in one atomic step.
+# KEYS[1] bucket key; ARGV: capacity, refill per second, now, cost, ttl
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / refill_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+# Upper bound on buckets kept by the in-process fallback
+MAX_LOCAL_BUCKETS = 100000
+
+
+def _parse_costs(costs: Dict[str, float]) -> List[Tuple[Optional[str], str, float]]:
+    # Keys are a path prefix, optionally preceded by a method: "POST /cad/jobs".
+    # Longest prefix first so "/research/batch" wins over "/research", and
+    # method-specific entries before generic ones for the same prefix
+    entries = []
+    for key, cost in costs.items():
+        method, _, prefix = key.rpartition(" ")
+        entries.append((method or None, prefix, cost))
+    return sorted(entries, key=lambda entry: (len(entry[1]), entry[0] is not None), reverse=True)
+
+
+class RateLimitDecision:
+    def __init__(self, allowed: bool, remaining: float, retry_after: float):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket limiter implementing APISettings.RATE_LIMIT per RATE_LIMIT_PERIOD.
+
+    Buckets live in Redis (updated by a Lua script so concurrent workers
+    share one budget) and fall back to process-local buckets when Redis is
+    not configured or a call fails.
+    """
+
+    def __init__(
+            self,
+            capacity: int,
+            period: int,
+            route_costs: Dict[str, int],
+            item_costs: Optional[Dict[str, float]] = None
+    ):
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+        self.route_costs = _parse_costs(route_costs)
+        self.item_costs = _parse_costs(item_costs or {})
+        self._local_buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._script = None
+        self.allowed = 0
+        self.rejected = 0
+        self.redis_errors = 0
+
+    def cost_for(self, path: str, method: Optional[str] = None) -> float:
+        return self._lookup(self.route_costs, path, method, default=1)
+
+    def item_cost_for(self, path: str, method: Optional[str] = None) -> float:
+        return self._lookup(self.item_costs, path, method, default=0)
+
+    async def charge_items(self, request: Request, items: int) -> None:
+        """Charge a batch route per item, once its body has been parsed.
+
+        The middleware only knows the flat route cost; without this a batch
+        of N items would cost as much as a single request. A batch costing
+        more than the whole bucket is rejected outright since it could
+        never be admitted.
+        """
+        # Set by RateLimitMiddleware; absent when limiting is off or the path is exempt
+        identity = getattr(request.state, "rate_limit_identity", None)
+        cost = self.item_cost_for(request.url.path, request.method) * items
+        if identity is None or not cost:
+            return
+
+        # The middleware already took the route cost from the same bucket
+        if cost + self.cost_for(request.url.path, request.method) > self.capacity:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch of {items} items costs {cost:g} rate limit tokens, "
+                       f"more than the limit of {self.capacity} per {self.period}s"
+            )
+        decision = await self.hit(identity, cost)
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: batch of {items} items costs {cost:g} tokens, "
+                       f"{int(decision.remaining)} remaining",
+                headers={"Retry-After": str(max(int(decision.retry_after + 0.999), 1))}
+            )
+
+    def _lookup(
+            self,
+            costs: List[Tuple[Optional[str], str, float]],
+            path: str,
+            method: Optional[str],
+            default: float
+    ) -> float:
+        if path.startswith(settings.API_V1_STR):
+            path = path[len(settings.API_V1_STR):]
+        for cost_method, prefix, cost in costs:
+            if path.startswith(prefix) and (cost_method is None or cost_method == method):
+                return cost
+        return default
+
+    async def hit(self, identity: str, cost: float) -> RateLimitDecision:
+        key = f"{settings.CACHE_PREFIX}:ratelimit:{identity}"
+        now = time.time()
+
+        decision = None
+        if redis_client.is_available:
+            decision = await self._hit_redis(key, now, cost)
+        if decision is None:
+            decision = self._hit_local(key, now, cost)
+
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    async def _hit_redis(self, key: str, now: float, cost: float) -> Optional[RateLimitDecision]:
+        try:
+            if self._script is None:
+                self._script = redis_client.client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, remaining, retry_after = await self._script(
+                keys=[key],
+                args=[self.capacity, self.refill_rate, now, cost, self.period]
+            )
+            return RateLimitDecision(bool(allowed), float(remaining), float(retry_after))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis rate limit check failed, using local bucket: {str(e)}")
+            return None
+
+    def _hit_local(self, key: str, now: float, cost: float) -> RateLimitDecision:
+        bucket = self._local_buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+            self._local_buckets[key] = bucket
+            if len(self._local_buckets) > MAX_LOCAL_BUCKETS:
+                self._local_buckets.popitem(last=False)
+        else:
+            self._local_buckets.move_to_end(key)
+
+        tokens = min(self.capacity, bucket[0] + max(0.0, now - bucket[1]) * self.refill_rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return RateLimitDecision(True, bucket[0], 0.0)
+
+        bucket[0] = tokens
+        return RateLimitDecision(False, tokens, (cost - tokens) / self.refill_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "redis_errors": self.redis_errors,
+            "local_buckets": len(self._local_buckets)
+        }
+
+
+rate_limiter = RateLimiter(
+    capacity=api_settings.RATE_LIMIT,
+    period=api_settings.RATE_LIMIT_PERIOD,
+    route_costs=api_settings.RATE_LIMIT_ROUTE_COSTS,
+    item_costs=api_settings.RATE_LIMIT_ITEM_COSTS
+)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware charging each request against its client's bucket.
+
+    Clients are identified by the JWT subject when a valid bearer token is
+    present and by client IP otherwise.
+    """
+
+    def __init__(self, app, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = set(api_settings.RATE_LIMIT_EXEMPT_PATHS)
+
+    async def __call__(self, scope, receive, send):
+        if (
+                scope["type"] != "http"
+                or not api_settings.RATE_LIMIT_ENABLED
+                or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        identity = await self._identify(scope)
+        # Batch routes charge per item against the same bucket (charge_items)
+        scope.setdefault("state", {})["rate_limit_identity"] = identity
+        decision = await self.limiter.hit(identity, self.limiter.cost_for(scope["path"], scope["method"]))
+        rate_headers = [
+            (b"x-ratelimit-limit", str(self.limiter.capacity).encode()),
+            (b"x-ratelimit-remaining", str(int(decision.remaining)).encode())
+        ]
+
+        if not decision.allowed:
+            await self._reject(scope, send, decision, rate_headers)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + rate_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _identify(self, scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            try:
+                payload = await SecurityHandler.decode_token(authorization[7:].strip())
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except Exception:
+                pass
+
+        if api_settings.RATE_LIMIT_TRUST_FORWARDED and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def _reject(self, scope, send, decision: RateLimitDecision, rate_headers) -> None:
+        body = json.dumps({
+            "error": "Rate limit exceeded",
+            "status_code": 429,
+            "path": scope["path"],
+            "timestamp": datetime.now().isoformat()
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(int(decision.retry_after + 0.999), 1)).encode())
+            ] + rate_headers
+        })
+        await send({"type": "http.response.body", "body": body})
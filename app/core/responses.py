@@ -0,0 +1,59 @@
+from typing import Any
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def _orjson_default(value: Any) -> Any:
+    # orjson handles datetimes, enums and dataclasses natively; pydantic
+    # models nested in dicts and anything else go through pydantic-core
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return to_jsonable_python(value)
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        # Serialized in Rust straight from the model, without an intermediate dict
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, or pydantic-core when orjson is missing.
+
+    Used as the app's default response class. Routes that already hold a
+    pydantic model of the right type can return ``FastJSONResponse(model)``
+    directly, which skips FastAPI's response_model revalidation and the
+    jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cached_json_response(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    """Serve pre-serialized JSON with a strong ETag, answering 304 when it matches."""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,23 +1,148 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple, Callable
+from weakref import WeakKeyDictionary
+import asyncio
+import hashlib
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+class TokenCache:
+    """Verified JWT payloads keyed by token hash, dropped at the token's exp."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def set(self, key: str, payload: Dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if not exp:
+            return
+        self._entries[key] = (float(exp), dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# The getters below build their objects on first use, so importing this
+# module does not load Settings
+@lru_cache()
+def get_token_cache() -> TokenCache:
+    return TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+@lru_cache()
+def get_pwd_context() -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
+
+
+class PasswordHashPool:
+    """Small thread pool keeping bcrypt off the event loop.
+
+    bcrypt releases the GIL, so threads are enough. A semaphore makes
+    excess callers wait on the loop (where they can be cancelled) instead
+    of piling up in the executor queue; asyncio primitives belong to one
+    loop, so there is one semaphore per running loop. The pool is started
+    and shut down by the app lifespan and started lazily when used
+    outside it.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+    @property
+    def is_started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+
+    async def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, True)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        self.start()
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+
+password_hash_pool = PasswordHashPool()
+
+
 class SecurityHandler:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return await password_hash_pool.run(get_pwd_context().verify, plain_password, hashed_password)
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        return await password_hash_pool.run(get_pwd_context().hash, password)
 
     @staticmethod
     def create_access_token(
@@ -45,6 +170,12 @@ class SecurityHandler:
 
     @staticmethod
     async def decode_token(token: str) -> Dict[str, Any]:
+        # Skip signature verification for tokens already verified and not yet expired
+        cache_key = TokenCache.key(token)
+        cached = get_token_cache().get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(
                 token,
@@ -56,6 +187,7 @@ class SecurityHandler:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token type"
                 )
+            get_token_cache().set(cache_key, payload)
             return payload
         except JWTError:
             raise HTTPException(
@@ -66,11 +198,10 @@ class SecurityHandler:
 
     @staticmethod
     async def validate_token(token: str) -> bool:
+        # decode_token already rejects bad signatures and expired tokens
         try:
             payload = await SecurityHandler.decode_token(token)
             exp = payload.get("exp")
-            if not exp or datetime.fromtimestamp(exp) < datetime.utcnow():
-                return False
-            return True
-        except:
+            return bool(exp) and exp > time.time()
+        except HTTPException:
             return False
@@ -45,6 +45,26 @@ class LogConfig(BaseModel):
 class APISettings(BaseModel):
     RATE_LIMIT: int = 100
     RATE_LIMIT_PERIOD: int = 3600  # 1 hour
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # Tokens charged per request by path prefix (after the API prefix),
+    # optionally restricted to one method ("POST /cad/jobs"); default 1
+    RATE_LIMIT_ROUTE_COSTS: Dict[str, int] = {
+        "/input/voice": 10,
+        "/input/image": 3,
+        "/cad/analyze": 5,
+        "POST /cad/jobs": 5,
+        "POST /cad/projects": 3,
+        "/research/batch": 1,
+        "/research": 2
+    }
+    # Tokens charged per item by batch routes once the body is parsed, on
+    # top of the route cost: a research query costs as much as /research/query
+    RATE_LIMIT_ITEM_COSTS: Dict[str, float] = {
+        "/research/batch": 2,
+        "/cad/batch": 0.1
+    }
+    RATE_LIMIT_EXEMPT_PATHS: list = ["/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"]
     MAX_REQUEST_SIZE: int = 10 * 1024 * 1024  # 10MB
     TIMEOUT: int = 60  # seconds
 
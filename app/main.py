@@ -1,10 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
+import asyncio
 import logging
 from app.api.endpoints import router
+from app.api.deps import (
+    get_cad_processor,
+    get_image_processor,
+    get_llama_processor,
+    get_perplexity_client,
+    get_voice_processor
+)
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.rate_limit import RateLimitMiddleware, rate_limiter
+from app.core.responses import FastJSONResponse
+from app.core.security import get_token_cache, password_hash_pool
+from app.services.cache import get_llama_response_cache
+from app.services.cad_catalog import cad_catalog
+from app.services.cad_rules import get_cad_rule_engine
+from app.services.cpu_executor import cpu_executor
+from app.services.http_client import http_client_pool
+from app.services.redis_client import redis_client
+from app.services.storage import storage
 
 # Configure logging
 logging.basicConfig(
@@ -13,14 +33,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+async def _startup() -> None:
+    # Open every pool before the first request so a fresh deploy does not
+    # pay connection setup on live traffic
+    logger.info("Opening connection pools...")
+    await http_client_pool.start()
+    await redis_client.connect()
+    await storage.connect()
+
+    logger.info("Building services...")
+    cad_catalog.load()
+    cpu_executor.start()
+    password_hash_pool.start()
+    get_llama_processor()
+    get_perplexity_client()
+    get_voice_processor()
+    get_image_processor()
+    get_cad_processor().start_workers()
+
+    if settings.STARTUP_WARMUP_ENABLED:
+        logger.info("Warming up workers and upstream connections...")
+        try:
+            workers = await asyncio.wait_for(
+                cpu_executor.warm_up(), timeout=settings.STARTUP_WARMUP_TIMEOUT
+            )
+            logger.info(f"{workers} CPU executor workers ready")
+        except asyncio.TimeoutError:
+            logger.warning("CPU executor warm-up timed out")
+        if settings.STARTUP_WARMUP_URLS:
+            reached = await http_client_pool.warm_up(
+                settings.STARTUP_WARMUP_URLS, timeout=settings.STARTUP_WARMUP_TIMEOUT
+            )
+            logger.info(f"Warmed {reached}/{len(settings.STARTUP_WARMUP_URLS)} upstream connections")
+
+
+async def _shutdown() -> None:
+    # Jobs may still write results, so drain them before flushing storage;
+    # everything shares one SHUTDOWN_TIMEOUT deadline
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SHUTDOWN_TIMEOUT
+
+    def remaining() -> float:
+        return max(deadline - loop.time(), 0.0)
+
+    logger.info("Draining CAD jobs...")
+    await get_cad_processor().stop_workers(
+        timeout=min(settings.CAD_JOB_SHUTDOWN_TIMEOUT, remaining())
+    )
+
+    logger.info("Flushing buffered writes...")
+    try:
+        await asyncio.wait_for(storage.close(), timeout=remaining())
+    except asyncio.TimeoutError:
+        logger.warning("Shutdown deadline reached before buffered writes were flushed")
+
+    logger.info("Closing connections...")
+    await http_client_pool.close()
+    await redis_client.close()
+    await cpu_executor.shutdown()
+    await password_hash_pool.shutdown()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application starting up...")
+    try:
+        await _startup()
+        logger.info("Application startup completed successfully")
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}", exc_info=True)
+        raise
+
+    yield
+
+    logger.info("Application shutting down...")
+    try:
+        await _shutdown()
+        logger.info("Application shutdown completed successfully")
+    except Exception as e:
+        logger.error(f"Shutdown failed: {str(e)}", exc_info=True)
+        raise
+
+
 app = FastAPI(
     title="NLP CAD Assistant",
     description="AI-powered CAD assistant with NLP capabilities",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Rate limiting runs inside CORS so rejected requests still carry CORS headers
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,25 +138,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so request timing covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
+registry.register_gauges("llama_cache", lambda: get_llama_response_cache().stats())
+registry.register_gauges("token_cache", lambda: get_token_cache().stats())
+registry.register_gauges("cpu_executor", cpu_executor.stats)
+registry.register_gauges("cad_jobs", lambda: get_cad_processor().queue_stats())
+registry.register_gauges("cad_rules", lambda: get_cad_rule_engine().stats())
+registry.register_gauges("cad_catalog", cad_catalog.stats)
+registry.register_gauges("cad_projects", lambda: get_cad_processor().projects.stats())
+registry.register_gauges("storage", storage.stats)
+registry.register_gauges("rate_limit", rate_limiter.stats)
+
 
 # Exception handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
             "path": request.url.path,
             "timestamp": datetime.now().isoformat()
-        }
+        },
+        # Keeps Retry-After on 429s
+        headers=exc.headers
     )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -67,49 +190,29 @@ async def health_check() -> dict:
         "status": "healthy",
         "version": app.version,
         "timestamp": datetime.now().isoformat(),
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "cache": {
+            "llama": get_llama_response_cache().stats(),
+            "tokens": get_token_cache().stats()
+        },
+        "executors": {
+            "cpu": cpu_executor.stats()
+        },
+        "cad_jobs": get_cad_processor().queue_stats(),
+        "cad_rules": get_cad_rule_engine().stats(),
+        "cad_catalog": cad_catalog.stats(),
+        "cad_projects": get_cad_processor().projects.stats(),
+        "storage": storage.stats(),
+        "rate_limit": rate_limiter.stats()
     }
 
 
-# Startup and shutdown events with logging
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application starting up...")
-    try:
-        # Initialize services
-        logger.info("Initializing services...")
-        # Add your service initialization here
-
-        # Verify database connections
-        logger.info("Verifying database connections...")
-        # Add your database connection verification here
-
-        # Load configurations
-        logger.info("Loading configurations...")
-        # Add your configuration loading here
-
-        logger.info("Application startup completed successfully")
-    except Exception as e:
-        logger.error(f"Startup failed: {str(e)}", exc_info=True)
-        raise
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutting down...")
-    try:
-        # Cleanup resources
-        logger.info("Cleaning up resources...")
-        # Add your cleanup logic here
-
-        # Close connections
-        logger.info("Closing connections...")
-        # Add your connection closing logic here
-
-        logger.info("Application shutdown completed successfully")
-    except Exception as e:
-        logger.error(f"Shutdown failed: {str(e)}", exc_info=True)
-        raise
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 # Include API router
@@ -0,0 +1,145 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import json
+import logging
+import time
+from app.core.config import settings
+from app.services.redis_client import redis_client
+from app.utils.helpers import Helper
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """In-process LRU cache with a maximum size and per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class ResponseCache:
+    """Two-tier (in-process LRU, then Redis) cache for upstream JSON responses.
+
+    Keys are content addressed: a hash of everything that determines the
+    upstream response, so identical requests map to the same entry.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, local_ttl: float, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(max_entries=max_entries, ttl=min(local_ttl, ttl))
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    def build_key(self, **fields: Any) -> str:
+        digest = Helper.generate_hash(json.dumps(fields, sort_keys=True, default=str))
+        return f"{settings.CACHE_PREFIX}:{self.namespace}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        if not redis_client.is_available:
+            return None
+
+        try:
+            raw = await redis_client.client.get(key)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis cache read failed: {str(e)}")
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.local.set(key, value)
+
+        if not redis_client.is_available:
+            return
+
+        try:
+            await redis_client.client.set(key, json.dumps(value), ex=self.ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "enabled": redis_client.is_available,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors
+            }
+        }
+
+
+@lru_cache()
+def get_llama_response_cache() -> ResponseCache:
+    # Built on first use so importing this module does not load Settings
+    return ResponseCache(
+        namespace="llama",
+        max_entries=settings.LLAMA_CACHE_MAX_ENTRIES,
+        local_ttl=settings.LLAMA_CACHE_LOCAL_TTL,
+        ttl=settings.CACHE_TTL
+    )
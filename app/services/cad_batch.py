@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional
+import itertools
+import math
+
+DIMENSIONS = ("length", "width", "height")
+
+
+def _range_length(start: float, stop: float, step: float) -> int:
+    if step <= 0:
+        raise ValueError("Sweep step must be positive")
+    if not all(math.isfinite(bound) for bound in (start, stop, step)):
+        raise ValueError("Sweep range bounds must be finite")
+    # Inclusive of stop, tolerant of float accumulation error
+    return max(int(math.floor((stop - start) / step + 1e-9)) + 1, 0)
+
+
+def _range_values(start: float, step: float, count: int) -> List[float]:
+    return [round(start + index * step, 10) for index in range(count)]
+
+
+def expand_sweep(sweep: Dict[str, Any], max_variants: int) -> List[Dict[str, Any]]:
+    """Cartesian product of the sweep axes as flat field overrides.
+
+    An axis is either a list of values or a {"start", "stop", "step"} range.
+    Axis lengths are computed arithmetically, so an oversized sweep is
+    rejected before any axis is materialized.
+    """
+    lengths = {}
+    for field, axis in sweep.items():
+        if isinstance(axis, dict):
+            lengths[field] = _range_length(axis["start"], axis["stop"], axis["step"])
+        else:
+            lengths[field] = len(axis)
+        if not lengths[field]:
+            raise ValueError(f"Sweep axis {field} has no values")
+
+    total = math.prod(lengths.values())
+    if total > max_variants:
+        raise ValueError(f"Sweep expands to {total} variants, limit is {max_variants}")
+
+    axes = []
+    for field, axis in sweep.items():
+        if isinstance(axis, dict):
+            values = _range_values(axis["start"], axis["step"], lengths[field])
+        else:
+            values = list(axis)
+        axes.append([(field, value) for value in values])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def flatten_specifications(specifications: Dict[str, Any]) -> Dict[str, Any]:
+    # Same field namespace as cad_rules.parameter_values
+    values = {
+        key: value for key, value in specifications.items()
+        if key not in ("dimensions", "material")
+    }
+    values.update(specifications.get("dimensions") or {})
+    values["material"] = specifications.get("material", "")
+    return values
+
+
+def build_columns(base: Dict[str, Any], variants: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """One list per field across all variants, falling back to the base value."""
+    fields = set(base)
+    for variant in variants:
+        fields.update(variant)
+    return {
+        field: [variant.get(field, base.get(field)) for variant in variants]
+        for field in fields
+    }
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_columns(columns: Dict[str, List[Any]], count: int) -> List[Optional[str]]:
+    """Validate and coerce the columns in place, column by column.
+
+    Dimension columns become floats (as CADParameters would coerce them)
+    and every other value a string. Returns the first error per variant,
+    or None for valid variants.
+    """
+    errors: List[Optional[str]] = [None] * count
+
+    for dimension in DIMENSIONS:
+        column = columns.get(dimension)
+        if column is None:
+            return [f"Missing required dimension: {dimension}"] * count
+
+        converted = [_as_float(value) for value in column]
+        for index, value in enumerate(converted):
+            if errors[index] is None and (value is None or not math.isfinite(value) or value <= 0):
+                errors[index] = f"Dimension {dimension} must be a positive number, got {column[index]!r}"
+        columns[dimension] = converted
+
+    for field, column in columns.items():
+        if field not in DIMENSIONS:
+            columns[field] = [None if value is None else str(value) for value in column]
+    return errors
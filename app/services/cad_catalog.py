@@ -0,0 +1,104 @@
+from typing import Any, Dict, Optional, Tuple
+import copy
+import hashlib
+import json
+import logging
+import os
+from app.core.config import settings
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cad_catalog.json")
+
+
+class CatalogEntry:
+    def __init__(self, body: bytes):
+        self.body = body
+        # Strong validator: derived from the exact bytes served
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class CADCatalog:
+    """Design templates and format compatibility, loaded from a JSON data file.
+
+    Every response the catalog can produce is serialized once at load time,
+    one entry per (design_type, complexity, scale) and per format, so
+    requests only look up bytes and an ETag.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.design_types: Tuple[str, ...] = ()
+        self.complexities: Tuple[str, ...] = ()
+        self.scales: Tuple[str, ...] = ()
+        self.formats: Tuple[str, ...] = ()
+        self._templates: Dict[Tuple[str, str, str], CatalogEntry] = {}
+        self._compatibility: Dict[str, CatalogEntry] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        path = self.path or settings.CAD_CATALOG_PATH or DEFAULT_CATALOG_PATH
+        with open(path, "r", encoding="utf-8") as catalog_file:
+            catalog = json.load(catalog_file)
+
+        templates: Dict[Tuple[str, str, str], CatalogEntry] = {}
+        for design_type, design_templates in catalog["templates"].items():
+            for complexity, names in catalog["complexities"].items():
+                for scale, factor in catalog["scales"].items():
+                    body = {
+                        name: self._scale_template(design_templates[name], factor)
+                        for name in names if name in design_templates
+                    }
+                    templates[(design_type, complexity, scale)] = CatalogEntry(dumps(body))
+
+        compatibility = {
+            file_format: CatalogEntry(dumps({
+                "format": file_format,
+                "compatibility": details,
+                "recommended_version": details["versions"][-1]
+            }))
+            for file_format, details in catalog["formats"].items()
+        }
+
+        # Swap in whole tables so concurrent readers never see a partial catalog
+        self._templates = templates
+        self._compatibility = compatibility
+        self.design_types = tuple(catalog["templates"])
+        self.complexities = tuple(catalog["complexities"])
+        self.scales = tuple(catalog["scales"])
+        self.formats = tuple(catalog["formats"])
+        self.loaded = True
+        logger.info(f"Loaded CAD catalog from {path} ({len(templates)} template sets, {len(compatibility)} formats)")
+
+    def templates(self, design_type: str, complexity: str, scale: str) -> Optional[CatalogEntry]:
+        self._ensure_loaded()
+        return self._templates.get((design_type, complexity, scale))
+
+    def compatibility(self, file_format: str) -> Optional[CatalogEntry]:
+        self._ensure_loaded()
+        return self._compatibility.get(file_format)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "template_sets": len(self._templates),
+            "formats": len(self._compatibility),
+            "bytes": sum(len(entry.body) for entry in self._templates.values())
+                     + sum(len(entry.body) for entry in self._compatibility.values())
+        }
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def _scale_template(self, template: Dict[str, Any], factor: float) -> Dict[str, Any]:
+        template = copy.deepcopy(template)
+        if "dimensions" in template and factor != 1.0:
+            template["dimensions"] = {
+                name: round(value * factor, 3) for name, value in template["dimensions"].items()
+            }
+        return template
+
+
+cad_catalog = CADCatalog()
@@ -0,0 +1,306 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import random
+import re
+import time
+from app.core import metrics
+from app.core.config import settings
+from app.services.cpu_executor import cpu_executor
+
+# name -> (density g/cm^3, cost per kg, yield strength MPa)
+MATERIALS: Dict[str, Tuple[float, float, float]] = {
+    "aluminum": (2.70, 2.5, 270.0),
+    "steel": (7.85, 1.0, 250.0),
+    "stainless_steel": (8.00, 3.0, 215.0),
+    "titanium": (4.43, 35.0, 880.0),
+    "brass": (8.50, 6.0, 200.0),
+    "copper": (8.96, 9.0, 70.0),
+    "abs": (1.04, 2.5, 40.0),
+    "pla": (1.24, 2.0, 50.0),
+    "nylon": (1.15, 4.0, 70.0)
+}
+MASS_UNITS = {"mg": 0.001, "g": 1.0, "kg": 1000.0, "lb": 453.592, "oz": 28.3495}
+LENGTH_UNITS = {"mm": 1.0, "cm": 10.0, "m": 1000.0, "in": 25.4}
+MIN_WALL_THICKNESS = 0.5  # mm
+
+# (material, wall thickness or 0.0 for solid, length/width/height scale factors)
+Candidate = Tuple[str, float, float, float, float]
+
+_QUANTITY = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*$")
+
+
+def parse_quantity(value: Any, units: Dict[str, float], default_unit: str) -> Optional[float]:
+    """Parse "1kg", "2 mm" or a bare number into the base unit (g or mm)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) * units[default_unit]
+    match = _QUANTITY.match(str(value))
+    if not match:
+        raise ValueError(f"Cannot parse quantity: {value}")
+    unit = match.group(2).lower() or default_unit
+    if unit not in units:
+        raise ValueError(f"Unknown unit {unit} in {value}")
+    return float(match.group(1)) * units[unit]
+
+
+def normalize_material(material: str) -> str:
+    return material.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def validate_materials(specifications: Dict[str, Any], constraints: Optional[Dict[str, Any]] = None) -> None:
+    """Raise ValueError naming the supported materials for any unknown one."""
+    requested = [specifications.get("material") or ""] + list((constraints or {}).get("materials") or [])
+    unknown = [str(name) for name in requested if normalize_material(str(name)) not in MATERIALS]
+    if unknown:
+        raise ValueError(
+            f"Unsupported material {', '.join(repr(name) for name in unknown)}; "
+            f"supported materials: {', '.join(sorted(MATERIALS))}"
+        )
+
+
+def evaluate_candidates(space: Dict[str, Any], candidates: List[Candidate]) -> List[Tuple[float, float, float, float, bool]]:
+    """Score a batch of candidates; runs in the CPU executor.
+
+    Returns (objective, mass g, cost, strength index, feasible) per
+    candidate. The body is modelled as a box, hollow with the given wall
+    thickness or solid when it is 0.
+    """
+    length, width, height = space["dimensions"]
+    mass_weight, cost_weight = space["weights"]
+    base_mass, base_cost = space["base_mass"], space["base_cost"]
+    max_mass, min_strength = space["max_mass"], space["min_strength"]
+
+    scores = []
+    for material, thickness, scale_l, scale_w, scale_h in candidates:
+        density, cost_per_kg, yield_strength = MATERIALS[material]
+        l, w, h = length * scale_l, width * scale_w, height * scale_h
+        volume = l * w * h
+        if thickness > 0:
+            volume -= max(l - 2 * thickness, 0.0) * max(w - 2 * thickness, 0.0) * max(h - 2 * thickness, 0.0)
+            strength = yield_strength * thickness
+        else:
+            strength = yield_strength * min(l, w, h)
+
+        mass = volume / 1000 * density
+        cost = mass / 1000 * cost_per_kg
+        feasible = strength >= min_strength and (max_mass is None or mass <= max_mass)
+        objective = mass_weight * mass / base_mass + cost_weight * cost / base_cost
+        scores.append((objective, mass, cost, strength, feasible))
+    return scores
+
+
+class DesignOptimizer:
+    """Randomized search over material, wall thickness and dimension scaling.
+
+    Each iteration evaluates batches of candidates in parallel on the CPU
+    executor: half sampled uniformly from the design space, half perturbed
+    around the best feasible design so far. In-flight batches are capped
+    across all concurrent optimizations (CAD_OPTIMIZER_MAX_INFLIGHT_BATCHES)
+    so the search never occupies every worker other requests rely on. The
+    search stops at the iteration limit or the time budget and always
+    returns the best design found by then.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+
+    def max_inflight_batches(self) -> int:
+        return settings.CAD_OPTIMIZER_MAX_INFLIGHT_BATCHES or max(cpu_executor.max_workers // 2, 1)
+
+    async def optimize(
+            self,
+            specifications: Dict[str, Any],
+            constraints: Optional[Dict[str, Any]] = None,
+            objectives: Optional[Dict[str, bool]] = None,
+            time_budget: Optional[float] = None,
+            max_iterations: Optional[int] = None
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        deadline = started + (time_budget or settings.CAD_OPTIMIZER_TIME_BUDGET)
+        max_iterations = max_iterations or settings.CAD_OPTIMIZER_MAX_ITERATIONS
+        space, bounds, baseline = self._build_space(specifications, constraints or {}, objectives or {})
+        rng = random.Random(self.seed)
+
+        base_score = evaluate_candidates(space, [baseline])[0]
+        best_candidate, best_score = baseline, base_score if base_score[4] else None
+        evaluations, iterations, stopped_by = 1, 0, "iterations"
+        parallelism = min(max(cpu_executor.max_workers, 1), self.max_inflight_batches())
+
+        with metrics.span("cad", "optimize"):
+            while iterations < max_iterations:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    stopped_by = "time_budget"
+                    break
+
+                spread = 0.5 * (1 - iterations / max_iterations) + 0.05
+                batches = [
+                    [self._sample(rng, bounds, best_candidate if best_score else None, spread)
+                     for _ in range(settings.CAD_OPTIMIZER_BATCH_SIZE)]
+                    for _ in range(parallelism)
+                ]
+                try:
+                    results = await asyncio.wait_for(
+                        asyncio.gather(*(self._evaluate(space, batch) for batch in batches)),
+                        timeout=remaining
+                    )
+                except asyncio.TimeoutError:
+                    stopped_by = "time_budget"
+                    break
+
+                iterations += 1
+                for batch, scores in zip(batches, results):
+                    evaluations += len(batch)
+                    for candidate, score in zip(batch, scores):
+                        if score[4] and (best_score is None or score[0] < best_score[0]):
+                            best_candidate, best_score = candidate, score
+
+        if best_score is None:
+            best_candidate, best_score = baseline, base_score
+
+        return {
+            "specifications": self._apply(specifications, space, best_candidate),
+            "original": self._describe(baseline, base_score),
+            "optimized": self._describe(best_candidate, best_score),
+            "metrics": {
+                "material_saved": self._percent(base_score[1] - best_score[1], base_score[1]),
+                "cost_reduced": self._percent(base_score[2] - best_score[2], base_score[2]),
+                "strength_improved": self._percent(best_score[3] - base_score[3], base_score[3]),
+                "feasible": best_score[4],
+                "evaluations": evaluations,
+                "iterations": iterations,
+                "stopped_by": stopped_by,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+            }
+        }
+
+    async def _evaluate(self, space: Dict[str, Any], batch: List[Candidate]) -> List[Tuple[float, float, float, float, bool]]:
+        # Created on first use, once the CPU executor (and its worker count) is started
+        if self._batch_slots is None:
+            self._batch_slots = asyncio.Semaphore(self.max_inflight_batches())
+        async with self._batch_slots:
+            return await cpu_executor.run(evaluate_candidates, space, batch)
+
+    def _build_space(
+            self,
+            specifications: Dict[str, Any],
+            constraints: Dict[str, Any],
+            objectives: Dict[str, bool]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Candidate]:
+        dimensions = specifications.get("dimensions") or {}
+        try:
+            dims = tuple(float(dimensions[name]) for name in ("length", "width", "height"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Optimization requires numeric length, width and height")
+        if min(dims) <= 0:
+            raise ValueError("Dimensions must be positive")
+
+        validate_materials(specifications, constraints)
+        material = normalize_material(str(specifications.get("material") or ""))
+
+        thickness = parse_quantity(specifications.get("wall_thickness"), LENGTH_UNITS, "mm") or 0.0
+        max_thickness = parse_quantity(constraints.get("max_thickness"), LENGTH_UNITS, "mm")
+        min_thickness = parse_quantity(constraints.get("min_thickness"), LENGTH_UNITS, "mm") or MIN_WALL_THICKNESS
+        if max_thickness is None:
+            max_thickness = thickness or min(dims) / 2
+        max_thickness = min(max_thickness, min(dims) / 2)
+
+        if "materials" in constraints:
+            materials = [normalize_material(name) for name in constraints["materials"]]
+        elif objectives.get("material_usage", True) or objectives.get("manufacturing_cost", True):
+            materials = list(MATERIALS)
+        else:
+            materials = [material]
+        materials = materials or [material]
+
+        max_change = float(constraints.get("max_dimension_change", settings.CAD_OPTIMIZER_MAX_DIMENSION_CHANGE))
+        baseline: Candidate = (material, min(thickness, max_thickness) if thickness else 0.0, 1.0, 1.0, 1.0)
+
+        # Weights are normalized by the baseline so mass and cost are comparable
+        space = {
+            "dimensions": dims,
+            "weights": (
+                1.0 if objectives.get("material_usage", True) else 0.0,
+                1.0 if objectives.get("manufacturing_cost", True) else 0.0
+            ),
+            "base_mass": 1.0,
+            "base_cost": 1.0,
+            "max_mass": parse_quantity(constraints.get("max_weight"), MASS_UNITS, "g"),
+            "min_strength": 0.0
+        }
+        _, base_mass, base_cost, base_strength, _ = evaluate_candidates(space, [baseline])[0]
+        space["base_mass"] = base_mass or 1.0
+        space["base_cost"] = base_cost or 1.0
+        if space["weights"] == (0.0, 0.0):
+            space["weights"] = (1.0, 1.0)
+        if objectives.get("structural_integrity", True):
+            space["min_strength"] = base_strength * float(constraints.get("min_strength_ratio", 1.0))
+
+        bounds = {
+            "materials": materials,
+            "thickness": (min(min_thickness, max_thickness), max_thickness) if thickness else None,
+            "scale": (max(1.0 - max_change, 0.01), 1.0)
+        }
+        return space, bounds, baseline
+
+    def _sample(
+            self,
+            rng: random.Random,
+            bounds: Dict[str, Any],
+            around: Optional[Candidate],
+            spread: float
+    ) -> Candidate:
+        low_scale, high_scale = bounds["scale"]
+        thickness_bounds = bounds["thickness"]
+
+        if around is None or rng.random() < 0.5:
+            material = rng.choice(bounds["materials"])
+            thickness = rng.uniform(*thickness_bounds) if thickness_bounds else 0.0
+            scales = [rng.uniform(low_scale, high_scale) for _ in range(3)]
+        else:
+            material = around[0] if rng.random() < 0.8 else rng.choice(bounds["materials"])
+            thickness = 0.0
+            if thickness_bounds:
+                low, high = thickness_bounds
+                thickness = min(max(around[1] + rng.gauss(0, spread * (high - low)), low), high)
+            scales = [
+                min(max(scale + rng.gauss(0, spread * (high_scale - low_scale)), low_scale), high_scale)
+                for scale in around[2:]
+            ]
+        return (material, round(thickness, 3), round(scales[0], 4), round(scales[1], 4), round(scales[2], 4))
+
+    def _apply(self, specifications: Dict[str, Any], space: Dict[str, Any], candidate: Candidate) -> Dict[str, Any]:
+        material, thickness, scale_l, scale_w, scale_h = candidate
+        length, width, height = space["dimensions"]
+        optimized = {
+            **specifications,
+            "material": material,
+            "dimensions": {
+                **specifications.get("dimensions", {}),
+                "length": round(length * scale_l, 3),
+                "width": round(width * scale_w, 3),
+                "height": round(height * scale_h, 3)
+            }
+        }
+        if thickness:
+            optimized["wall_thickness"] = f"{thickness}mm"
+        return optimized
+
+    def _describe(self, candidate: Candidate, score: Tuple[float, float, float, float, bool]) -> Dict[str, Any]:
+        return {
+            "material": candidate[0],
+            "wall_thickness_mm": candidate[1] or None,
+            "mass_g": round(score[1], 3),
+            "cost": round(score[2], 4),
+            "strength_index": round(score[3], 3)
+        }
+
+    def _percent(self, delta: float, reference: float) -> str:
+        if not reference:
+            return "0%"
+        return f"{delta / reference * 100:.1f}%"
+
+
+design_optimizer = DesignOptimizer()
@@ -1,6 +1,31 @@
-from typing import List, Dict, Optional, Any
-from app.models.cad_model import CADParameters
+from typing import List, Dict, Optional, Any, AsyncIterator
+from datetime import datetime
+from app.core import metrics
+from app.core.config import settings
+from app.models.cad_model import CADParameters, CADInstruction
+from app.services.cad_batch import build_columns, flatten_specifications, validate_columns
+from app.services.cache import LRUCache
+from app.services.cad_optimizer import design_optimizer, validate_materials
+from app.services.cad_projects import (
+    ProjectConflictError, ProjectNotFoundError, ProjectState, ProjectStore, VersionConflictError
+)
+from app.services.cad_rules import get_cad_rule_engine, parameter_values
+from app.services.cad_validation import ValidationResult, validation_engine
+from app.services.storage import storage, CAD_JOBS
+from app.utils.helpers import Helper
 import asyncio
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lower values are dequeued first
+JOB_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# Times a project version is regenerated after losing a version number to
+# another worker before the request fails
+PROJECT_VERSION_ATTEMPTS = 3
 
 
 class DesignVerification:
@@ -10,23 +35,192 @@ class DesignVerification:
         self.status: str = "pending"
 
 
-class ValidationResult:
-    def __init__(self):
-        self.is_valid: bool = True
-        self.details: List[str] = []
-        self.recommendations: List[str] = []
-        self.metrics: Dict[str, Any] = {}
+class QueueFullError(Exception):
+    pass
+
+
+class CADJob:
+    def __init__(self, request: Dict[str, Any], priority: str = "normal"):
+        self.job_id: str = Helper.generate_unique_id("cadjob")
+        self.request = request
+        self.priority = priority
+        self.status: str = "queued"
+        self.result: Optional[CADInstruction] = None
+        self.error: Optional[str] = None
+        self.created_at: datetime = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            **self.to_dict(),
+            "project_name": self.request.get("project_id"),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "result": self.result.model_dump() if self.result else None
+        }
 
 
 class CADProcessor:
     def __init__(self):
         self.supported_formats = ["obj", "stl", "step", "iges"]
-        self.processing_queue = asyncio.Queue()
-        self.design_rules = {
-            "3D_MODEL": self._generate_3d_instructions,
-            "2D_DRAWING": self._generate_2d_instructions
+        self.processing_queue = asyncio.PriorityQueue(maxsize=settings.CAD_JOB_QUEUE_SIZE)
+        self.jobs: Dict[str, CADJob] = {}
+        self._job_sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self.rule_engine = get_cad_rule_engine()
+        self.validation_engine = validation_engine
+        self.optimizer = design_optimizer
+        self.projects = ProjectStore(
+            max_projects=settings.CAD_PROJECT_MAX_PROJECTS,
+            max_versions=settings.CAD_PROJECT_MAX_VERSIONS
+        )
+        self._research_cache = LRUCache(max_entries=settings.CAD_RESEARCH_CACHE_MAX_ENTRIES, ttl=float("inf"))
+
+    def submit_job(self, request: Dict[str, Any], priority: str = "normal") -> CADJob:
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        self._prune_jobs()
+        self.start_workers()
+
+        job = CADJob(request=request, priority=priority)
+        try:
+            # The sequence number keeps FIFO order within a priority lane
+            self.processing_queue.put_nowait((JOB_PRIORITIES[priority], next(self._job_sequence), job))
+        except asyncio.QueueFull:
+            raise QueueFullError("CAD job queue is full")
+
+        self.jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[CADJob]:
+        return self.jobs.get(job_id)
+
+    async def lookup_job(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            document = job.to_dict()
+            if include_result:
+                document["result"] = job.result
+            return document
+
+        # Finished jobs from other workers are only visible once persisted
+        projection = None if include_result else {"result": 0}
+        return await storage.find_one(CAD_JOBS, {"job_id": job_id}, projection)
+
+    def start_workers(self, count: Optional[int] = None) -> None:
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        missing = (count or settings.CAD_JOB_WORKERS) - len(self._workers)
+        for _ in range(max(missing, 0)):
+            self._workers.append(asyncio.create_task(self._job_worker()))
+
+    async def stop_workers(self, timeout: Optional[float] = None) -> None:
+        if not self._workers:
+            return
+        try:
+            # Let queued jobs finish before cancelling the consumers
+            await asyncio.wait_for(self.processing_queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.processing_queue.qsize()} CAD jobs left unprocessed at shutdown")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def queue_stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": len(self._workers),
+            "queue_size": self.processing_queue.qsize(),
+            "queue_capacity": self.processing_queue.maxsize,
+            "jobs": statuses
         }
 
+    async def _job_worker(self) -> None:
+        while True:
+            _, _, job = await self.processing_queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                self.processing_queue.task_done()
+
+    async def _run_job(self, job: CADJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            request = job.request
+            instructions = await self.generate_instructions(
+                design_type=request["design_type"],
+                specifications=request["specifications"],
+                research_results=request.get("research_results")
+            )
+
+            verification = await self.verify_design_feasibility(instructions)
+            if not verification.is_feasible:
+                raise ValueError(f"Design is not feasible: {verification.reason}")
+
+            metadata = {
+                "project_id": request.get("project_id"),
+                "version": request.get("version"),
+                "verification_status": verification.status,
+                "job_id": job.job_id
+            }
+
+            if request.get("optimize"):
+                optimized = await self.optimize_design(
+                    instructions=instructions,
+                    parameters=request.get("objectives") or {},
+                    design_type=request["design_type"],
+                    specifications=request["specifications"],
+                    constraints=request.get("constraints"),
+                    research_results=request.get("research_results")
+                )
+                instructions = optimized["instructions"]
+                metadata["optimization_metrics"] = optimized["metrics"]
+
+            job.result = CADInstruction(
+                design_type=request["design_type"],
+                instructions=instructions,
+                project_name=request.get("project_id"),
+                status="completed",
+                metadata=metadata
+            )
+            job.status = "completed"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.completed_at = datetime.now()
+            storage.save(CAD_JOBS, job.to_document())
+
+    def _prune_jobs(self) -> None:
+        now = datetime.now()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.is_finished and (now - job.completed_at).total_seconds() > settings.CAD_JOB_RESULT_TTL
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
     async def generate_instructions(
             self,
             design_type: str,
@@ -34,19 +228,18 @@ class CADProcessor:
             research_results: Optional[List[str]] = None
     ) -> List[str]:
         try:
-            parameters = CADParameters(
-                dimensions=specifications.get('dimensions', {}),
-                material=specifications.get('material', ''),
-                specifications=specifications
-            )
-
-            if design_type not in self.design_rules:
+            if not self.rule_engine.supports(design_type):
                 raise ValueError(f"Unsupported design type: {design_type}")
 
-            instructions = await self.design_rules[design_type](parameters)
+            with metrics.span("cad", "parse_parameters"):
+                parameters = self.parse_parameters(specifications)
+
+            with metrics.span("cad", "generate_instructions"):
+                instructions = self.rule_engine.render(design_type, parameter_values(parameters))
 
             if research_results:
-                research_instructions = await self._process_research_insights(research_results)
+                with metrics.span("cad", "research_insights"):
+                    research_instructions = await self._process_research_insights(research_results)
                 instructions.extend(research_instructions)
 
             return instructions
@@ -54,72 +247,184 @@ class CADProcessor:
         except Exception as e:
             raise Exception(f"CAD Processing Error: {str(e)}")
 
-    async def _generate_3d_instructions(self, parameters: CADParameters) -> List[str]:
-        instructions = []
-        dimensions = parameters.dimensions
+    async def generate_batch(
+            self,
+            design_type: str,
+            specifications: Dict,
+            variants: List[Dict[str, Any]],
+            research_results: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result per variant, in order.
 
-        if 'height' in dimensions and 'width' in dimensions:
-            instructions.append(f"Create base with height {dimensions['height']} and width {dimensions['width']}")
+        Variants are flat field overrides of the base specifications (e.g.
+        {"length": 120, "material": "steel"}). Validation runs column by
+        column over all variants instead of building a CADParameters per
+        variant, and research insights are computed once for the batch.
+        """
+        rule_set = self.rule_engine.rule_set(design_type)
+        started = time.perf_counter()
 
-        if parameters.material:
-            instructions.append(f"Apply material: {parameters.material}")
+        with metrics.span("cad", "batch_validate"):
+            columns = build_columns(flatten_specifications(specifications), variants)
+            errors = validate_columns(columns, len(variants))
 
-        return instructions
+        research_instructions = []
+        if research_results:
+            research_instructions = await self._process_research_insights(research_results)
 
-    async def _generate_2d_instructions(self, parameters: CADParameters) -> List[str]:
-        instructions = []
-        dimensions = parameters.dimensions
+        fields = list(columns)
+        for index, variant in enumerate(variants):
+            if errors[index] is not None:
+                yield {"index": index, "status": "error", "variant": variant, "error": errors[index]}
+            else:
+                values = {field: columns[field][index] for field in fields}
+                yield {
+                    "index": index,
+                    "status": "success",
+                    "variant": variant,
+                    "instructions": self.rule_engine.render(rule_set.design_type, values) + research_instructions
+                }
+            # Give other requests a turn between chunks of a large sweep
+            if index % settings.CAD_BATCH_CHUNK_SIZE == settings.CAD_BATCH_CHUNK_SIZE - 1:
+                await asyncio.sleep(0)
 
-        if 'length' in dimensions and 'width' in dimensions:
-            instructions.append(f"Draw rectangle with length {dimensions['length']} and width {dimensions['width']}")
+        metrics.STAGE_DURATION.observe(time.perf_counter() - started, component="cad", stage="batch_generate")
 
-        return instructions
+    def parse_parameters(self, specifications: Dict) -> CADParameters:
+        # Everything besides dimensions and material is a free-form string specification
+        return CADParameters(
+            dimensions=specifications.get('dimensions', {}),
+            material=specifications.get('material', ''),
+            specifications={
+                key: str(value) for key, value in specifications.items()
+                if key not in ('dimensions', 'material') and value is not None
+            }
+        )
 
     async def _process_research_insights(self, research_results: List[str]) -> List[str]:
         instructions = []
         for result in research_results:
-            if "design pattern" in result.lower():
-                instructions.append(f"Apply design pattern: {result}")
+            # Cached per research string; an empty tuple means "no insight"
+            insight = self._research_cache.get(result)
+            if insight is None:
+                insight = (f"Apply design pattern: {result}",) if "design pattern" in result.lower() else ()
+                self._research_cache.set(result, insight)
+            instructions.extend(insight)
         return instructions
 
-    async def validate_instructions(
+    async def generate_incremental(
             self,
-            instructions: List[str],
-            validation_level: str = "DETAILED"
-    ) -> ValidationResult:
-        validation_result = ValidationResult()
-
-        for instruction in instructions:
-            instruction_valid = await self._validate_single_instruction(instruction)
-            if not instruction_valid["is_valid"]:
-                validation_result.is_valid = False
-                validation_result.details.append(instruction_valid["detail"])
-                validation_result.recommendations.append(instruction_valid["recommendation"])
-
-        validation_result.metrics = await self._calculate_validation_metrics(instructions)
-        return validation_result
-
-    async def _validate_single_instruction(self, instruction: str) -> Dict[str, Any]:
-        result = {
-            "is_valid": True,
-            "detail": "",
-            "recommendation": ""
-        }
+            project_id: str,
+            design_type: str,
+            specifications: Dict,
+            research_results: Optional[List[str]] = None,
+            base_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Generate a new project version, recomputing only what changed.
+
+        The specification is diffed field by field against `base_version`
+        (the latest version by default). Only instruction groups whose
+        templates reference a changed field are re-rendered, and research
+        insights are reused unless the research list changed. Returns the
+        new version and a patch of the groups that differ from the base.
+        A version number taken by another worker in the meantime is
+        regenerated against the new latest version, up to
+        PROJECT_VERSION_ATTEMPTS times.
+        """
+        rule_set = self.rule_engine.rule_set(design_type)
+        started = time.perf_counter()
+        research_results = list(research_results or [])
+
+        async with self.projects.lock(project_id):
+            for attempt in range(PROJECT_VERSION_ATTEMPTS):
+                latest = await self.projects.get(project_id)
+                previous = latest if base_version is None else await self.projects.get(project_id, base_version)
+                if base_version is not None and previous is None:
+                    raise ProjectNotFoundError(f"Project {project_id} has no version {base_version}")
+
+                with metrics.span("cad", "incremental_generate"):
+                    values = parameter_values(self.parse_parameters(specifications))
+                    full_regeneration = previous is None or previous.design_type != design_type
+
+                    if full_regeneration:
+                        changed_fields = sorted(values)
+                        recomputed = list(rule_set.groups)
+                        groups = self.rule_engine.render_groups(design_type, values)
+                    else:
+                        changed_fields = sorted(
+                            field for field in set(values) | set(previous.values)
+                            if values.get(field) != previous.values.get(field)
+                        )
+                        recomputed = rule_set.affected_groups(set(changed_fields))
+                        groups = {**previous.groups, **rule_set.render_groups(values, recomputed)}
 
-        if not instruction:
-            result["is_valid"] = False
-            result["detail"] = "Empty instruction detected"
-            result["recommendation"] = "Provide a valid instruction"
+                    research_changed = full_regeneration or research_results != previous.research_results
+                    if research_changed:
+                        research_instructions = await self._process_research_insights(research_results)
+                    else:
+                        research_instructions = previous.research_instructions
 
-        return result
+                state = ProjectState(
+                    project_id=project_id,
+                    version=latest.version + 1 if latest else 1,
+                    design_type=design_type,
+                    specifications=specifications,
+                    values=values,
+                    groups=groups,
+                    research_results=research_results,
+                    research_instructions=research_instructions
+                )
+
+                verification = await self.verify_design_feasibility(state.instructions)
+                if not verification.is_feasible:
+                    raise ValueError(f"Design is not feasible: {verification.reason}")
+                try:
+                    await self.projects.put(state)
+                    break
+                except VersionConflictError:
+                    # Another worker stored this version first: reload the
+                    # latest version from storage and diff against it again
+                    logger.info(f"Version conflict on project {project_id}, attempt {attempt + 1}")
+                    self.projects.forget(project_id)
+            else:
+                raise ProjectConflictError(
+                    f"Project {project_id} is being updated concurrently, retry the request"
+                )
+
+        patch: Dict[str, Any] = {
+            "groups": {
+                group: groups[group] for group in recomputed
+                if full_regeneration or groups[group] != previous.groups.get(group)
+            }
+        }
+        if research_changed and (full_regeneration or research_instructions != previous.research_instructions):
+            patch["research_instructions"] = research_instructions
 
-    async def _calculate_validation_metrics(self, instructions: List[str]) -> Dict[str, Any]:
         return {
-            "instruction_count": len(instructions),
-            "complexity_score": len(instructions) * 1.5,
-            "estimated_processing_time": f"{len(instructions) * 2}min"
+            "project_id": project_id,
+            "version": state.version,
+            "base_version": previous.version if previous else None,
+            "full_regeneration": full_regeneration,
+            "changed_fields": changed_fields,
+            "patch": patch,
+            "state": state,
+            "metrics": {
+                "recomputed_groups": len(recomputed),
+                "total_groups": len(rule_set.groups),
+                "instruction_count": len(state.instructions),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+            }
         }
 
+    async def validate_instructions(
+            self,
+            instructions: List[str],
+            validation_level: str = "DETAILED",
+            fail_fast: Optional[bool] = None
+    ) -> ValidationResult:
+        with metrics.span("cad", "validate_instructions"):
+            return self.validation_engine.validate(instructions, validation_level, fail_fast)
+
     async def verify_design_feasibility(self, instructions: List[str]) -> DesignVerification:
         verification = DesignVerification()
 
@@ -133,19 +438,53 @@ class CADProcessor:
             verification.status = "failed"
             return verification
 
+    def validate_optimization(self, specifications: Optional[Dict], constraints: Optional[Dict[str, Any]] = None) -> None:
+        # Same precondition as optimize_design: without dimensions nothing is optimized
+        if specifications and specifications.get("dimensions"):
+            validate_materials(specifications, constraints)
+
     async def optimize_design(
             self,
             instructions: List[str],
-            parameters: Dict[str, bool]
+            parameters: Dict[str, bool],
+            design_type: Optional[str] = None,
+            specifications: Optional[Dict] = None,
+            constraints: Optional[Dict[str, Any]] = None,
+            research_results: Optional[List[str]] = None,
+            time_budget: Optional[float] = None
     ) -> Dict[str, Any]:
+        # Without dimensions and a material there is nothing to optimize
+        if not specifications or not specifications.get("dimensions"):
+            return {
+                "instructions": instructions.copy(),
+                "specifications": specifications,
+                "metrics": {
+                    "material_saved": "0%",
+                    "strength_improved": "0%",
+                    "cost_reduced": "0%",
+                    "optimized": False
+                }
+            }
+
+        result = await self.optimizer.optimize(
+            specifications=specifications,
+            constraints=constraints,
+            objectives=parameters,
+            time_budget=time_budget
+        )
+
         optimized_instructions = instructions.copy()
-        optimization_metrics = {
-            "material_saved": "0%",
-            "strength_improved": "0%",
-            "cost_reduced": "0%"
-        }
+        if design_type and self.rule_engine.supports(design_type):
+            optimized_instructions = await self.generate_instructions(
+                design_type=design_type,
+                specifications=result["specifications"],
+                research_results=research_results
+            )
 
         return {
             "instructions": optimized_instructions,
-            "metrics": optimization_metrics
+            "specifications": result["specifications"],
+            "original": result["original"],
+            "optimized": result["optimized"],
+            "metrics": {**result["metrics"], "optimized": True}
         }
\ No newline at end of file
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+from app.services.storage import storage, CAD_PROJECTS, DuplicateDocumentError
+
+
+class ProjectNotFoundError(Exception):
+    pass
+
+
+class ProjectConflictError(Exception):
+    pass
+
+
+class VersionConflictError(Exception):
+    """Another worker already stored this project version."""
+    pass
+
+
+class ProjectState:
+    """One generated version of a project: its inputs and instructions by group."""
+
+    def __init__(
+            self,
+            project_id: str,
+            version: int,
+            design_type: str,
+            specifications: Dict[str, Any],
+            values: Dict[str, Any],
+            groups: Dict[str, List[str]],
+            research_results: List[str],
+            research_instructions: List[str],
+            created_at: Optional[datetime] = None
+    ):
+        self.project_id = project_id
+        self.version = version
+        self.design_type = design_type
+        self.specifications = specifications
+        self.values = values
+        self.groups = groups
+        self.research_results = research_results
+        self.research_instructions = research_instructions
+        self.created_at = created_at or datetime.now()
+
+    @property
+    def instructions(self) -> List[str]:
+        instructions = [instruction for group in self.groups.values() for instruction in group]
+        return instructions + self.research_instructions
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "project_id": self.project_id,
+            "version": self.version,
+            "design_type": self.design_type,
+            "specifications": self.specifications,
+            "groups": self.groups,
+            "research_instructions": self.research_instructions,
+            "instructions": self.instructions,
+            "created_at": self.created_at.isoformat()
+        }
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "project_id": self.project_id,
+            "project_name": self.project_id,
+            "version": self.version,
+            "design_type": self.design_type,
+            "specifications": self.specifications,
+            "values": self.values,
+            "groups": self.groups,
+            "research_results": self.research_results,
+            "research_instructions": self.research_instructions,
+            "created_at": self.created_at
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "ProjectState":
+        return cls(
+            project_id=document["project_id"],
+            version=document["version"],
+            design_type=document["design_type"],
+            specifications=document["specifications"],
+            values=document["values"],
+            groups=document["groups"],
+            research_results=document["research_results"],
+            research_instructions=document["research_instructions"],
+            created_at=document.get("created_at")
+        )
+
+
+class ProjectStore:
+    """Recent project versions in memory, backed by the cad_projects collection.
+
+    Keeps the last `max_versions` versions of the `max_projects` most
+    recently used projects; older versions are read back from storage.
+    Versions are written straight to MongoDB, where the unique
+    (project_id, version) index decides which worker gets a version
+    number; the in-memory copy of the latest version is only a hint.
+    """
+
+    def __init__(self, max_projects: int, max_versions: int):
+        self.max_projects = max_projects
+        self.max_versions = max_versions
+        self._projects: "OrderedDict[str, OrderedDict[int, ProjectState]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lock(self, project_id: str) -> asyncio.Lock:
+        # Serializes updates per project within this process; across
+        # processes the unique index in put() is what prevents duplicates
+        if project_id not in self._locks:
+            self._locks[project_id] = asyncio.Lock()
+        return self._locks[project_id]
+
+    async def get(self, project_id: str, version: Optional[int] = None) -> Optional[ProjectState]:
+        versions = self._projects.get(project_id)
+        if versions:
+            self._projects.move_to_end(project_id)
+            if version is None:
+                self.hits += 1
+                return versions[next(reversed(versions))]
+            if version in versions:
+                self.hits += 1
+                return versions[version]
+
+        self.misses += 1
+        if version is None:
+            documents = await storage.find_many(
+                CAD_PROJECTS, {"project_id": project_id}, limit=1, sort=[("version", -1)]
+            )
+            document = documents[0] if documents else None
+        else:
+            document = await storage.find_one(CAD_PROJECTS, {"project_id": project_id, "version": version})
+        return ProjectState.from_document(document) if document else None
+
+    async def put(self, state: ProjectState) -> None:
+        """Store a new version, unbuffered.
+
+        Raises VersionConflictError when the version already exists in
+        storage and lets any other write error propagate; the version is
+        only cached once it is durable.
+        """
+        try:
+            await storage.insert_one(CAD_PROJECTS, state.to_document())
+        except DuplicateDocumentError:
+            raise VersionConflictError(f"Project {state.project_id} already has version {state.version}")
+
+        versions = self._projects.setdefault(state.project_id, OrderedDict())
+        versions[state.version] = state
+        while len(versions) > self.max_versions:
+            versions.popitem(last=False)
+        self._projects.move_to_end(state.project_id)
+
+        while len(self._projects) > self.max_projects:
+            evicted, _ = self._projects.popitem(last=False)
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+
+    def forget(self, project_id: str) -> None:
+        # Drops a stale cached copy so the next get() reads storage
+        self._projects.pop(project_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self._projects),
+            "versions": sum(len(versions) for versions in self._projects.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
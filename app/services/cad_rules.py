@@ -0,0 +1,175 @@
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.models.cad_model import CADParameters, DesignType
+from app.services.cache import LRUCache
+
+# Instruction templates per design type as (group, template) pairs, in output
+# order. Placeholders name a dimension ("length", "width", "height"),
+# "material" or any key of CADParameters.specifications; a template is only
+# emitted when every field it references has a value. Groups are the unit of
+# incremental regeneration: a changed field only invalidates the groups
+# whose templates reference it.
+DESIGN_RULES: Dict[str, List[Tuple[str, str]]] = {
+    DesignType.MODEL_3D.value: [
+        ("base", "Create base with height {height} and width {width}"),
+        ("base", "Extrude base to length {length}"),
+        ("material", "Apply material: {material}"),
+        ("finish", "Apply tolerance: {tolerance}"),
+        ("finish", "Apply surface finish: {surface_finish}")
+    ],
+    DesignType.DRAWING_2D.value: [
+        ("outline", "Draw rectangle with length {length} and width {width}"),
+        ("outline", "Project side view with height {height}"),
+        ("annotations", "Annotate material: {material}"),
+        ("annotations", "Annotate tolerance: {tolerance}"),
+        ("annotations", "Add scale note: {scale}")
+    ],
+    DesignType.ASSEMBLY.value: [
+        ("envelope", "Define assembly envelope {length} x {width} x {height}"),
+        ("components", "Insert components: {components}"),
+        ("components", "Assign default material: {material}"),
+        ("constraints", "Apply mate constraints: {mates}"),
+        ("constraints", "Apply fastener standard: {fasteners}"),
+        ("verification", "Check interference within envelope {length} x {width} x {height}")
+    ],
+    DesignType.PROTOTYPE.value: [
+        ("body", "Create prototype body {length} x {width} x {height}"),
+        ("body", "Apply prototype material: {material}"),
+        ("process", "Prepare for {process} fabrication"),
+        ("process", "Set layer height: {layer_height}"),
+        ("finish", "Apply tolerance: {tolerance}"),
+        ("finish", "Apply surface finish: {surface_finish}")
+    ]
+}
+
+
+def parameter_values(parameters: CADParameters) -> Dict[str, Any]:
+    """Flatten CADParameters into the field namespace templates are evaluated against."""
+    values: Dict[str, Any] = dict(parameters.specifications)
+    values.update(parameters.dimensions)
+    values["material"] = parameters.material
+    return values
+
+
+class CompiledTemplate:
+    def __init__(self, group: str, template: str):
+        self.group = group
+        self.template = template
+        # Placeholders are parsed once here instead of on every render
+        self.fields: FrozenSet[str] = frozenset(
+            field for _, field, _, _ in Formatter().parse(template) if field
+        )
+        self._format = template.format_map
+
+    def render(self, values: Dict[str, Any]) -> Optional[str]:
+        for field in self.fields:
+            if values.get(field) in (None, ""):
+                return None
+        return self._format(values)
+
+
+class CompiledRuleSet:
+    def __init__(self, design_type: str, rules: List[Tuple[str, str]]):
+        self.design_type = design_type
+        self.templates = tuple(CompiledTemplate(group, template) for group, template in rules)
+        self.groups: Tuple[str, ...] = tuple(dict.fromkeys(template.group for template in self.templates))
+        self.group_templates: Dict[str, Tuple[CompiledTemplate, ...]] = {
+            group: tuple(t for t in self.templates if t.group == group)
+            for group in self.groups
+        }
+        self.group_fields: Dict[str, FrozenSet[str]] = {
+            group: frozenset().union(*(t.fields for t in self.group_templates[group]))
+            for group in self.groups
+        }
+        self.fields: FrozenSet[str] = frozenset().union(*self.group_fields.values())
+        self.key_fields: Tuple[str, ...] = tuple(sorted(self.fields))
+
+    def render_groups(self, values: Dict[str, Any], groups: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        rendered: Dict[str, List[str]] = {}
+        for group in self.groups if groups is None else groups:
+            instructions = []
+            for template in self.group_templates[group]:
+                instruction = template.render(values)
+                if instruction is not None:
+                    instructions.append(instruction)
+            rendered[group] = instructions
+        return rendered
+
+    def affected_groups(self, changed_fields: Set[str]) -> List[str]:
+        return [group for group in self.groups if self.group_fields[group] & changed_fields]
+
+
+class CADRuleEngine:
+    """Renders instructions from DESIGN_RULES, compiled once when the engine is built.
+
+    Only the fields a rule set references take part in the memo key, so
+    parameter sets that differ in unrelated specification keys share an
+    entry.
+    """
+
+    def __init__(self, rules: Dict[str, List[Tuple[str, str]]] = DESIGN_RULES, cache_size: int = 4096):
+        self.rule_sets: Dict[str, CompiledRuleSet] = {
+            design_type: CompiledRuleSet(design_type, entries)
+            for design_type, entries in rules.items()
+        }
+        self._cache = LRUCache(max_entries=cache_size, ttl=float("inf"))
+
+    def supports(self, design_type: str) -> bool:
+        return design_type in self.rule_sets
+
+    def rule_set(self, design_type: str) -> CompiledRuleSet:
+        if design_type not in self.rule_sets:
+            raise ValueError(f"Unsupported design type: {design_type}")
+        return self.rule_sets[design_type]
+
+    def render_groups(self, design_type: str, values: Dict[str, Any]) -> Dict[str, List[str]]:
+        groups, _ = self._render_cached(design_type, values)
+        # Callers may extend the lists, so never hand out the cached ones
+        return {group: list(instructions) for group, instructions in groups}
+
+    def render(self, design_type: str, values: Dict[str, Any]) -> List[str]:
+        _, instructions = self._render_cached(design_type, values)
+        return list(instructions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "design_types": len(self.rule_sets),
+            "templates": sum(len(rule_set.templates) for rule_set in self.rule_sets.values()),
+            "cache": self._cache.stats()
+        }
+
+    def _render_cached(
+            self,
+            design_type: str,
+            values: Dict[str, Any]
+    ) -> Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], Tuple[str, ...]]:
+        rule_set = self.rule_set(design_type)
+        key = self._cache_key(rule_set, values)
+        cached = self._cache.get(key)
+        if cached is None:
+            rendered = rule_set.render_groups(values)
+            # Grouped and flat forms are both kept so a hit is a single copy
+            cached = (
+                tuple((group, tuple(instructions)) for group, instructions in rendered.items()),
+                tuple(instruction for instructions in rendered.values() for instruction in instructions)
+            )
+            self._cache.set(key, cached)
+        return cached
+
+    def _cache_key(self, rule_set: CompiledRuleSet, values: Dict[str, Any]) -> Hashable:
+        field_values = tuple(map(values.get, rule_set.key_fields))
+        # Types are part of the key: 100 and 100.0 are equal but render differently
+        key = (rule_set.design_type, field_values, tuple(map(type, field_values)))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable values (lists, dicts) are keyed by their rendered text
+            key = (rule_set.design_type, tuple(map(str, field_values)))
+        return key
+
+
+@lru_cache()
+def get_cad_rule_engine() -> CADRuleEngine:
+    return CADRuleEngine(cache_size=settings.CAD_RULE_CACHE_MAX_ENTRIES)
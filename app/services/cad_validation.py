@@ -0,0 +1,207 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import re
+import time
+
+VALIDATION_LEVELS = ("QUICK", "STANDARD", "DETAILED")
+MAX_INSTRUCTION_LENGTH = 500
+
+# Instruction -> True when the rule is violated
+Check = Callable[[str], bool]
+
+
+class ValidationResult:
+    def __init__(self):
+        self.is_valid: bool = True
+        self.details: List[str] = []
+        self.recommendations: List[str] = []
+        self.metrics: Dict[str, Any] = {}
+
+
+class ValidationRule:
+    """A check applied to every instruction of a batch.
+
+    Errors make the result invalid; warnings only add details and
+    recommendations. `levels` lists the validation levels the rule runs at.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            check: Check,
+            detail: str,
+            recommendation: str,
+            severity: str = "error",
+            levels: Tuple[str, ...] = VALIDATION_LEVELS
+    ):
+        self.name = name
+        self.check = check
+        self.detail = detail
+        self.recommendation = recommendation
+        self.severity = severity
+        self.levels = levels
+
+    def violations(self, instructions: List[str]) -> Iterator[int]:
+        check = self.check
+        return (index for index, instruction in enumerate(instructions) if check(instruction))
+
+
+_DIMENSION_VALUE = re.compile(
+    r"\b(?:length|width|height|depth|thickness|diameter|radius)\s*[:=]?\s*(-?\d+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+_OPERATION = re.compile(
+    r"^\s*(?:add|annotate|apply|assign|check|create|define|draw|drill|extrude|fillet|"
+    r"insert|mirror|pattern|prepare|project|revolve|set|sketch|sweep)\b",
+    re.IGNORECASE
+)
+
+
+def _non_positive_dimension(instruction: str) -> bool:
+    return any(float(value) <= 0 for value in _DIMENSION_VALUE.findall(instruction))
+
+
+def _duplicate_checker() -> Check:
+    # Stateful per run: flags every repeat after the first occurrence
+    seen = set()
+
+    def check(instruction: str) -> bool:
+        if instruction in seen:
+            return True
+        seen.add(instruction)
+        return False
+
+    return check
+
+
+def default_rules() -> List[ValidationRule]:
+    return [
+        ValidationRule(
+            "non_empty",
+            lambda instruction: not instruction or not instruction.strip(),
+            "Empty instruction detected",
+            "Provide a valid instruction"
+        ),
+        ValidationRule(
+            "positive_dimensions",
+            _non_positive_dimension,
+            "Non-positive dimension in instruction",
+            "Use dimensions greater than zero"
+        ),
+        ValidationRule(
+            "max_length",
+            lambda instruction: len(instruction) > MAX_INSTRUCTION_LENGTH,
+            f"Instruction exceeds {MAX_INSTRUCTION_LENGTH} characters",
+            "Split long instructions into separate steps",
+            levels=("STANDARD", "DETAILED")
+        ),
+        ValidationRule(
+            "known_operation",
+            lambda instruction: bool(instruction.strip()) and not _OPERATION.match(instruction),
+            "Instruction does not start with a known CAD operation",
+            "Start instructions with an operation such as Create, Extrude or Apply",
+            severity="warning",
+            levels=("DETAILED",)
+        )
+    ]
+
+
+class ValidationEngine:
+    """Runs the rules of a validation level over a whole instruction list.
+
+    Each rule scans all instructions before the next rule starts, so the
+    cost is linear in rules x instructions. With fail_fast (the default for
+    QUICK) validation stops at the first error.
+    """
+
+    def __init__(self, rules: Optional[List[ValidationRule]] = None):
+        self.rules: List[ValidationRule] = []
+        self.stateful_rules: Dict[str, Callable[[], ValidationRule]] = {}
+        self._rule_sets: Dict[str, List[ValidationRule]] = {}
+        for rule in rules if rules is not None else default_rules():
+            self.register(rule)
+        self.register_stateful("duplicate", lambda: ValidationRule(
+            "duplicate",
+            _duplicate_checker(),
+            "Duplicate instruction detected",
+            "Remove repeated instructions",
+            severity="warning",
+            levels=("DETAILED",)
+        ))
+
+    def register(self, rule: ValidationRule) -> None:
+        self.rules.append(rule)
+        self._compile()
+
+    def register_stateful(self, name: str, factory: Callable[[], ValidationRule]) -> None:
+        # Rules that keep state across instructions are rebuilt for every run
+        self.stateful_rules[name] = factory
+
+    def validate(
+            self,
+            instructions: List[str],
+            validation_level: str = "DETAILED",
+            fail_fast: Optional[bool] = None
+    ) -> ValidationResult:
+        if validation_level not in self._rule_sets:
+            raise ValueError(f"Unknown validation level: {validation_level}")
+        if fail_fast is None:
+            fail_fast = validation_level == "QUICK"
+
+        started = time.perf_counter()
+        result = ValidationResult()
+        rule_timings: Dict[str, float] = {}
+        errors = warnings = 0
+        stopped_early = False
+
+        rules = list(self._rule_sets[validation_level])
+        for factory in self.stateful_rules.values():
+            rule = factory()
+            if validation_level in rule.levels:
+                rules.append(rule)
+
+        for rule in rules:
+            rule_started = time.perf_counter()
+            violations = rule.violations(instructions)
+            if fail_fast and rule.severity == "error":
+                first = next(violations, None)
+                indices = [] if first is None else [first]
+            else:
+                indices = list(violations)
+            rule_timings[rule.name] = round((time.perf_counter() - rule_started) * 1000, 3)
+
+            if indices:
+                if rule.severity == "error":
+                    result.is_valid = False
+                    errors += len(indices)
+                else:
+                    warnings += len(indices)
+                result.details.extend(
+                    f"{rule.detail} (instruction {index + 1})" for index in indices
+                )
+                result.recommendations.append(rule.recommendation)
+
+            if fail_fast and not result.is_valid:
+                stopped_early = True
+                break
+
+        result.metrics = {
+            "instruction_count": len(instructions),
+            "validation_level": validation_level,
+            "rules_evaluated": len(rule_timings),
+            "errors": errors,
+            "warnings": warnings,
+            "stopped_early": stopped_early,
+            "rule_timings_ms": rule_timings,
+            "validation_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        return result
+
+    def _compile(self) -> None:
+        # Rule lists per level are resolved once, not on every validation
+        self._rule_sets = {
+            level: [rule for rule in self.rules if level in rule.levels]
+            for level in VALIDATION_LEVELS
+        }
+
+
+validation_engine = ValidationEngine()
@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(fn: Callable[..., Any], *args) -> Tuple[float, float, Any]:
+    # Runs in the worker; wall-clock timestamps are comparable across processes
+    started_at = time.time()
+    result = fn(*args)
+    return started_at, time.time(), result
+
+
+def _warm_worker() -> int:
+    # Spawns the worker process and pays the heavy imports before traffic arrives
+    for module in ("PIL.Image", "PIL.ImageStat", "pydub"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    return os.getpid()
+
+
+class CPUExecutor:
+    """Process pool for CPU-bound work (audio decoding, image parsing).
+
+    Work submitted through `run` never executes on the event loop. Until
+    the pool is started (or when it is disabled) calls fall back to the
+    loop's default thread pool. Submitted callables and their arguments
+    must be picklable, i.e. module-level functions.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.max_workers = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    @property
+    def is_started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        if self._pool is not None or not settings.CPU_EXECUTOR_ENABLED:
+            return
+        self.max_workers = settings.CPU_EXECUTOR_WORKERS or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        logger.info(f"CPU executor started with {self.max_workers} worker processes")
+
+    async def warm_up(self) -> int:
+        # ProcessPoolExecutor spawns workers on demand, so submit one task per worker
+        if self._pool is None:
+            return 0
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _warm_worker)
+            for _ in range(self.max_workers)
+        ))
+        return len(set(pids))
+
+    async def shutdown(self) -> None:
+        if self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        await asyncio.to_thread(pool.shutdown, True)
+        logger.info("CPU executor stopped")
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self.submitted += 1
+        self.in_flight += 1
+        try:
+            started_at, finished_at, result = await loop.run_in_executor(
+                self._pool, _timed_call, fn, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        wait_time = max(started_at - submitted_at, 0.0)
+        self.completed += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.total_run_time += finished_at - started_at
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.is_started,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.max_workers, 0),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_time": self.total_wait_time / self.completed if self.completed else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "avg_run_time": self.total_run_time / self.completed if self.completed else 0.0
+        }
+
+
+cpu_executor = CPUExecutor()
@@ -0,0 +1,80 @@
+from typing import List, Optional
+import asyncio
+import logging
+import aiohttp
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientPool:
+    """Process-wide aiohttp session shared by the upstream API clients.
+
+    The session is opened in the application startup hook and closed on
+    shutdown, so connections (and their TLS sessions) are kept alive and
+    reused across requests instead of being set up per call.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def start(self) -> aiohttp.ClientSession:
+        async with self._lock:
+            if not self.is_started:
+                connector = aiohttp.TCPConnector(
+                    limit=settings.HTTP_POOL_LIMIT,
+                    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                    use_dns_cache=True
+                )
+                timeout = aiohttp.ClientTimeout(
+                    total=settings.HTTP_TOTAL_TIMEOUT,
+                    sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+                    sock_read=settings.HTTP_READ_TIMEOUT
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=timeout
+                )
+                logger.info(
+                    f"HTTP client pool started (limit={settings.HTTP_POOL_LIMIT}, "
+                    f"per_host={settings.HTTP_POOL_LIMIT_PER_HOST})"
+                )
+            return self._session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        # Fall back to lazy creation when used outside the app lifecycle
+        if self.is_started:
+            return self._session
+        return await self.start()
+
+    async def warm_up(self, urls: List[str], timeout: float) -> int:
+        # Opens (and keeps alive) a connection per host; any response counts
+        session = await self.get_session()
+
+        async def probe(url: str) -> bool:
+            try:
+                async with session.head(url, timeout=aiohttp.ClientTimeout(total=timeout)):
+                    return True
+            except Exception as e:
+                logger.warning(f"Warm-up request to {url} failed: {str(e)}")
+                return False
+
+        results = await asyncio.gather(*(probe(url) for url in urls))
+        return sum(results)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+                logger.info("HTTP client pool closed")
+            self._session = None
+
+
+http_client_pool = HTTPClientPool()
@@ -1,6 +1,21 @@
-from typing import Dict, Any
-from PIL import Image
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Union
 import io
+import time
+from app.core import metrics
+from app.services.cpu_executor import cpu_executor
+
+# analysis_type -> tier. "header" reads only the file header, "thumbnail"
+# decodes a reduced-size image and "full" decodes every pixel.
+ANALYSIS_TIERS = {
+    "basic": "header",
+    "header": "header",
+    "thumbnail": "thumbnail",
+    "full": "full"
+}
+THUMBNAIL_SIZE = (256, 256)
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 
 class ImageAnalysis:
@@ -9,30 +24,83 @@ class ImageAnalysis:
         self.metadata = metadata
 
 
+def _band_statistics(image: "Image.Image") -> Dict[str, Any]:
+    from PIL import ImageStat
+
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGB")
+    stat = ImageStat.Stat(image)
+    return {
+        "bands": list(image.getbands()),
+        "mean": [round(value, 2) for value in stat.mean],
+        "stddev": [round(value, 2) for value in stat.stddev],
+        "extrema": stat.extrema
+    }
+
+
+def _analyze_image(image_data: Union[bytes, str], analysis_type: str) -> Tuple[str, Dict[str, Any]]:
+    # Runs in the CPU executor so PIL parsing never blocks the event loop.
+    # Spooled uploads arrive as a path, small ones as bytes. PIL is imported
+    # here so only the worker processes load it.
+    from PIL import Image
+
+    tier = ANALYSIS_TIERS[analysis_type]
+    started = time.perf_counter()
+    source = image_data if isinstance(image_data, str) else io.BytesIO(image_data)
+
+    with Image.open(source) as image:
+        # Extract basic image metadata; Image.open only parses the header
+        metadata = {
+            "format": image.format,
+            "size": image.size,
+            "mode": image.mode,
+            "analysis_type": analysis_type,
+            "analysis_tier": tier
+        }
+
+        if tier == "thumbnail":
+            # draft() lets the JPEG decoder scale by 1/2..1/8 instead of decoding full size
+            if image.format == "JPEG":
+                image.draft("RGB", THUMBNAIL_SIZE)
+            image.thumbnail(THUMBNAIL_SIZE, reducing_gap=2.0)
+            metadata["thumbnail_size"] = image.size
+            metadata["statistics"] = _band_statistics(image)
+        elif tier == "full":
+            image.load()
+            metadata["statistics"] = _band_statistics(image)
+            metadata["frame_count"] = getattr(image, "n_frames", 1)
+
+    metadata["analysis_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    # Generate basic description
+    description = f"Image of type {metadata['format']} with dimensions {metadata['size']}"
+    return description, metadata
+
+
 class ImageProcessor:
+    def __init__(self):
+        self.analysis_types = list(ANALYSIS_TIERS)
+
     async def analyze(
             self,
-            image_data: bytes,
+            image_data: Union[bytes, str],
             analysis_type: str = "basic"
     ) -> ImageAnalysis:
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_data))
+            if analysis_type not in ANALYSIS_TIERS:
+                raise ValueError(f"Unsupported analysis type: {analysis_type}")
 
-            # Extract basic image metadata
-            metadata = {
-                "format": image.format,
-                "size": image.size,
-                "mode": image.mode,
-                "analysis_type": analysis_type
-            }
+            if isinstance(image_data, bytes):
+                metrics.record_payload("image", "image_upload", len(image_data))
 
-            # Generate basic description
-            description = f"Image of type {image.format} with dimensions {image.size}"
+            with metrics.span("image", f"analyze_{ANALYSIS_TIERS[analysis_type]}"):
+                description, metadata = await cpu_executor.run(
+                    _analyze_image, image_data, analysis_type
+                )
 
             return ImageAnalysis(
                 description=description,
                 metadata=metadata
             )
         except Exception as e:
-            raise Exception(f"Image processing error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Image processing error: {str(e)}")
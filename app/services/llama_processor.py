@@ -1,7 +1,11 @@
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, AsyncIterator, Tuple
 from datetime import datetime
-import aiohttp
+import json
+import time
+from app.core import metrics
 from app.core.config import settings
+from app.services.cache import get_llama_response_cache
+from app.services.http_client import http_client_pool
 
 
 class LLaMAProcessor:
@@ -16,24 +20,20 @@ class LLaMAProcessor:
             text: str,
             context: Optional[Dict] = None,
             max_tokens: int = 1000,
-            temperature: float = 0.7
+            temperature: float = 0.7,
+            use_cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "model": self.model,
-                "prompt": text,
-                "context": context,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "timestamp": datetime.now().isoformat()
-            }
-
-            async with aiohttp.ClientSession() as session:
+            cache_key = self._get_cache_key(text, context, max_tokens, temperature, use_cache)
+            if cache_key is not None:
+                cached = await get_llama_response_cache().get(cache_key)
+                if cached is not None:
+                    return cached
+
+            headers, payload = self._build_request(text, context, max_tokens, temperature)
+
+            session = await http_client_pool.get_session()
+            with metrics.upstream_span("llama", "completion"):
                 async with session.post(
                         f"{self.base_url}/completions",
                         headers=headers,
@@ -41,23 +41,163 @@ class LLaMAProcessor:
                 ) as response:
                     if response.status != 200:
                         raise Exception(f"API Error: {response.status}")
-                    return await response.json()
+                    body = await response.read()
+            metrics.record_payload("llama", "completion_response", len(body))
+            result = json.loads(body)
+
+            if cache_key is not None:
+                await get_llama_response_cache().set(cache_key, result)
+            return result
 
         except Exception as e:
             raise Exception(f"LLaMA Processing Error: {str(e)}")
 
+    async def stream_query(
+            self,
+            text: str,
+            context: Optional[Dict] = None,
+            max_tokens: int = 1000,
+            temperature: float = 0.7,
+            use_cache: Optional[bool] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield completion chunks as the upstream produces them.
+
+        Each chunk has the same shape as a non-streamed response
+        (``choices[0].text`` holds the new tokens). A cached completion is
+        replayed as a single chunk.
+        """
+        try:
+            cache_key = self._get_cache_key(text, context, max_tokens, temperature, use_cache)
+            if cache_key is not None:
+                cached = await get_llama_response_cache().get(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+
+            headers, payload = self._build_request(text, context, max_tokens, temperature)
+            payload["stream"] = True
+
+            text_parts = []
+            confidence = 0.0
+            started = time.perf_counter()
+            session = await http_client_pool.get_session()
+            async with session.post(
+                    f"{self.base_url}/completions",
+                    headers=headers,
+                    json=payload
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"API Error: {response.status}")
+
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    if not text_parts:
+                        metrics.UPSTREAM_DURATION.observe(
+                            time.perf_counter() - started, component="llama", stage="first_token"
+                        )
+                    text_parts.append(chunk.get("choices", [{}])[0].get("text", ""))
+                    confidence = chunk.get("confidence", confidence)
+                    yield chunk
+
+            if cache_key is not None:
+                await get_llama_response_cache().set(cache_key, {
+                    "choices": [{"text": "".join(text_parts)}],
+                    "confidence": confidence
+                })
+
+        except Exception as e:
+            raise Exception(f"LLaMA Streaming Error: {str(e)}")
+
     async def analyze_cad_requirements(
             self,
             text: str,
-            detailed: bool = False
+            detailed: bool = False,
+            use_cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         try:
             prompt = self._build_cad_prompt(text, detailed)
-            response = await self.process_query(prompt)
+            response = await self.process_query(prompt, use_cache=use_cache)
             return self._process_cad_analysis(response)
         except Exception as e:
             raise Exception(f"CAD Analysis Error: {str(e)}")
 
+    async def stream_cad_requirements(
+            self,
+            text: str,
+            detailed: bool = False,
+            use_cache: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ("token", text) events followed by one ("analysis", result) event."""
+        try:
+            prompt = self._build_cad_prompt(text, detailed)
+            text_parts = []
+            confidence = 0.0
+
+            async for chunk in self.stream_query(prompt, use_cache=use_cache):
+                token = chunk.get("choices", [{}])[0].get("text", "")
+                confidence = chunk.get("confidence", confidence)
+                if token:
+                    text_parts.append(token)
+                    yield "token", token
+
+            yield "analysis", self._process_cad_analysis({
+                "choices": [{"text": "".join(text_parts)}],
+                "confidence": confidence
+            })
+        except Exception as e:
+            raise Exception(f"CAD Analysis Error: {str(e)}")
+
+    def _get_cache_key(
+            self,
+            text: str,
+            context: Optional[Dict],
+            max_tokens: int,
+            temperature: float,
+            use_cache: Optional[bool]
+    ) -> Optional[str]:
+        # Deterministic completions are cached by default, sampled ones only on request
+        if use_cache is None:
+            use_cache = temperature <= settings.LLAMA_CACHE_MAX_TEMPERATURE
+        if not use_cache:
+            return None
+
+        return get_llama_response_cache().build_key(
+            model=self.model,
+            prompt=text,
+            context=context,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+
+    def _build_request(
+            self,
+            text: str,
+            context: Optional[Dict],
+            max_tokens: int,
+            temperature: float
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": self.model,
+            "prompt": text,
+            "context": context,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "timestamp": datetime.now().isoformat()
+        }
+        return headers, payload
+
     def _build_cad_prompt(self, text: str, detailed: bool) -> str:
         base_prompt = f"Analyze the following CAD design requirements: {text}"
         if detailed:
@@ -70,4 +210,4 @@ class LLaMAProcessor:
             "analysis": response.get("choices", [{}])[0].get("text", ""),
             "confidence": response.get("confidence", 0.0),
             "processed_at": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
@@ -1,13 +1,18 @@
 from typing import List, Optional, Dict, Any
-import aiohttp
+import json
+from app.core import metrics
 from app.core.config import settings
 from app.models.research_model import ResearchResult, ResearchSource
+from app.services.http_client import http_client_pool
+from app.utils.concurrency import SingleFlight
+from app.utils.helpers import Helper
 
 
 class PerplexityClient:
     def __init__(self):
         self.api_key = settings.PERPLEXITY_API_KEY
         self.base_url = "https://api.perplexity.ai"
+        self.inflight_queries = SingleFlight()
 
     async def research_query(
             self,
@@ -15,6 +20,43 @@ class PerplexityClient:
             max_results: int = 5,
             context: Optional[str] = None,
             filters: Optional[Dict[str, Any]] = None
+    ) -> ResearchResult:
+        # Identical concurrent queries share a single upstream call and its result
+        key = self._build_query_key(query, max_results, context, filters)
+        result = await self.inflight_queries.do(
+            key,
+            self._fetch_research,
+            query,
+            max_results,
+            context,
+            filters
+        )
+        # The key ignores case and whitespace, so echo each caller's own query
+        if result.query != query:
+            result = result.model_copy(update={"query": query})
+        return result
+
+    def _build_query_key(
+            self,
+            query: str,
+            max_results: int,
+            context: Optional[str],
+            filters: Optional[Dict[str, Any]]
+    ) -> str:
+        normalized = {
+            "query": " ".join(Helper.clean_text(query).split()),
+            "max_results": max_results,
+            "context": " ".join(Helper.clean_text(context).split()) if context else None,
+            "filters": filters or None
+        }
+        return Helper.generate_hash(json.dumps(normalized, sort_keys=True, default=str))
+
+    async def _fetch_research(
+            self,
+            query: str,
+            max_results: int,
+            context: Optional[str],
+            filters: Optional[Dict[str, Any]]
     ) -> ResearchResult:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -28,14 +70,18 @@ class PerplexityClient:
             "filters": filters
         }
 
-        async with aiohttp.ClientSession() as session:
+        session = await http_client_pool.get_session()
+        with metrics.upstream_span("perplexity", "research"):
             async with session.post(
                     f"{self.base_url}/research",
                     headers=headers,
                     json=payload
             ) as response:
-                data = await response.json()
-                return self._process_research_results(data, query)
+                body = await response.read()
+        metrics.record_payload("perplexity", "research_response", len(body))
+
+        with metrics.span("perplexity", "process_results"):
+            return self._process_research_results(json.loads(body), query)
 
     def _process_research_results(self, data: dict, query: str) -> ResearchResult:
         sources = [
@@ -77,13 +123,13 @@ class PerplexityClient:
             "Content-Type": "application/json"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    f"{self.base_url}/trending",
-                    headers=headers
-            ) as response:
-                data = await response.json()
-                return data.get("topics", [])
+        session = await http_client_pool.get_session()
+        async with session.get(
+                f"{self.base_url}/trending",
+                headers=headers
+        ) as response:
+            data = await response.json()
+            return data.get("topics", [])
 
     async def generate_summary(self, results: List[ResearchSource]) -> str:
         combined_content = "\n".join(
@@ -100,11 +146,11 @@ class PerplexityClient:
             "max_length": 500
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                    f"{self.base_url}/summarize",
-                    headers=headers,
-                    json=payload
-            ) as response:
-                data = await response.json()
-                return data.get("summary", "")
\ No newline at end of file
+        session = await http_client_pool.get_session()
+        async with session.post(
+                f"{self.base_url}/summarize",
+                headers=headers,
+                json=payload
+        ) as response:
+            data = await response.json()
+            return data.get("summary", "")
\ No newline at end of file
@@ -0,0 +1,44 @@
+from typing import Optional
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisClient:
+    """Shared async Redis connection pool.
+
+    Redis is optional: when REDIS_URL is unset or the server cannot be
+    reached, `client` stays None and callers fall back to in-process state.
+    """
+
+    def __init__(self):
+        self.client = None
+
+    @property
+    def is_available(self) -> bool:
+        return self.client is not None
+
+    async def connect(self) -> Optional[object]:
+        if self.client is not None or not settings.REDIS_URL:
+            return self.client
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=False)
+            await client.ping()
+            self.client = client
+            logger.info("Connected to Redis")
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-process fallbacks: {str(e)}")
+            self.client = None
+        return self.client
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Redis connection closed")
+
+
+redis_client = RedisClient()
@@ -0,0 +1,227 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CAD_INSTRUCTIONS = "cad_instructions"
+CAD_JOBS = "cad_jobs"
+PROCESSED_INPUTS = "processed_inputs"
+RESEARCH_RESULTS = "research_results"
+CAD_PROJECTS = "cad_projects"
+
+# MongoDB error code for unique index violations
+DUPLICATE_KEY_ERROR = 11000
+
+# Compound indexes per collection, created once at startup
+INDEXES: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    CAD_INSTRUCTIONS: [([("project_name", 1), ("created_at", -1)], {})],
+    CAD_JOBS: [
+        ([("job_id", 1)], {"unique": True}),
+        ([("project_name", 1), ("created_at", -1)], {})
+    ],
+    PROCESSED_INPUTS: [
+        ([("input_id", 1)], {"unique": True}),
+        ([("project_name", 1), ("created_at", -1)], {})
+    ],
+    RESEARCH_RESULTS: [([("project_name", 1), ("created_at", -1)], {})],
+    CAD_PROJECTS: [
+        ([("project_id", 1), ("version", -1)], {"unique": True}),
+        ([("project_id", 1), ("created_at", -1)], {})
+    ]
+}
+
+
+class DuplicateDocumentError(Exception):
+    pass
+
+
+class MongoStorage:
+    """Pooled motor client with buffered bulk inserts.
+
+    `save` only appends to an in-memory buffer; documents are written with
+    insert_many once STORAGE_FLUSH_SIZE documents are pending or every
+    STORAGE_FLUSH_INTERVAL seconds, so request handlers never wait on a
+    write round trip. When MongoDB is unreachable, saves are dropped and
+    reads return nothing.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.db = None
+        self._buffers: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # At most one flush per collection runs at a time
+        self._scheduled_flushes: Dict[str, asyncio.Task] = {}
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    @property
+    def is_available(self) -> bool:
+        return self.db is not None
+
+    async def connect(self) -> None:
+        if self.client is not None:
+            return
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS
+            )
+            await self.client.admin.command("ping")
+            self.db = self.client[settings.DATABASE_NAME]
+            await self._ensure_indexes()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info(f"Connected to MongoDB database {settings.DATABASE_NAME}")
+        except Exception as e:
+            logger.warning(f"MongoDB unavailable, results will not be persisted: {str(e)}")
+            if self.client is not None:
+                self.client.close()
+            self.client = None
+            self.db = None
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        while self._scheduled_flushes:
+            await asyncio.gather(*self._scheduled_flushes.values(), return_exceptions=True)
+        await self.flush()
+        if self.client is not None:
+            self.client.close()
+            logger.info("MongoDB connection closed")
+        self.client = None
+        self.db = None
+
+    def save(self, collection: str, document: Dict[str, Any]) -> None:
+        if not self.is_available:
+            self.dropped += 1
+            return
+
+        buffer = self._buffers.get(collection)
+        if buffer is None:
+            buffer = self._buffers[collection] = deque()
+        if len(buffer) >= settings.STORAGE_MAX_BUFFER:
+            buffer.popleft()
+            self.dropped += 1
+        buffer.append(document)
+
+        if len(buffer) >= settings.STORAGE_FLUSH_SIZE:
+            self._schedule_flush(collection)
+
+    async def insert_one(self, collection: str, document: Dict[str, Any]) -> bool:
+        """Write one document immediately, bypassing the buffer.
+
+        Returns False when MongoDB is unavailable. Write errors propagate so
+        the caller can fail the request; unique index violations are raised
+        as DuplicateDocumentError.
+        """
+        if not self.is_available:
+            return False
+        try:
+            await self.db[collection].insert_one(document)
+        except Exception as e:
+            if getattr(e, "code", None) == DUPLICATE_KEY_ERROR:
+                raise DuplicateDocumentError(str(e))
+            self.write_errors += 1
+            raise
+        self.written += 1
+        return True
+
+    async def flush(self, collection: Optional[str] = None) -> None:
+        if not self.is_available:
+            return
+
+        collections = [collection] if collection else list(self._buffers)
+        for name in collections:
+            documents = self._buffers.get(name)
+            if not documents:
+                continue
+            self._buffers[name] = deque()
+            try:
+                await self.db[name].insert_many(list(documents), ordered=False)
+                self.written += len(documents)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"Bulk insert into {name} failed: {str(e)}")
+
+    async def find_one(
+            self,
+            collection: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        if not self.is_available:
+            return None
+        return await self.db[collection].find_one(query, self._projection(projection))
+
+    async def find_many(
+            self,
+            collection: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, int]] = None,
+            limit: int = 50,
+            skip: int = 0,
+            sort: Optional[List[Tuple[str, int]]] = None
+    ) -> List[Dict[str, Any]]:
+        if not self.is_available:
+            return []
+        cursor = (
+            self.db[collection]
+            .find(query, self._projection(projection))
+            .sort(sort or [("created_at", -1)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_available,
+            "buffered": {name: len(documents) for name, documents in self._buffers.items()},
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors
+        }
+
+    def _projection(self, projection: Optional[Dict[str, int]]) -> Dict[str, int]:
+        # ObjectIds are not JSON serializable, so never return _id
+        return {"_id": 0, **(projection or {})}
+
+    async def _ensure_indexes(self) -> None:
+        for collection, indexes in INDEXES.items():
+            for keys, options in indexes:
+                await self.db[collection].create_index(keys, **options)
+
+    def _schedule_flush(self, collection: str) -> None:
+        # Saves that arrive while a flush is running wait for it to finish,
+        # so a burst never has more than one insert_many in flight
+        if collection in self._scheduled_flushes:
+            return
+        task = asyncio.create_task(self.flush(collection))
+        self._scheduled_flushes[collection] = task
+        task.add_done_callback(lambda _: self._flush_done(collection))
+
+    def _flush_done(self, collection: str) -> None:
+        del self._scheduled_flushes[collection]
+        buffer = self._buffers.get(collection)
+        if self.is_available and buffer and len(buffer) >= settings.STORAGE_FLUSH_SIZE:
+            self._schedule_flush(collection)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.STORAGE_FLUSH_INTERVAL)
+            for name, buffer in list(self._buffers.items()):
+                if buffer:
+                    self._schedule_flush(name)
+
+
+storage = MongoStorage()
@@ -1,32 +1,82 @@
-import assemblyai as aai
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, BinaryIO, Optional, Dict, Any, Union
 import asyncio
-import tempfile
+import io
 import os
-from pydub import AudioSegment
+from app.core import metrics
 from app.core.config import settings
+from app.services.cpu_executor import cpu_executor
+
+if TYPE_CHECKING:
+    import assemblyai as aai
+    from pydub import AudioSegment
+
+
+def _decode_audio(audio_data: Union[bytes, str]) -> "AudioSegment":
+    # pydub is only needed inside the CPU executor, so it is imported here
+    from pydub import AudioSegment
+
+    # Spooled uploads arrive as a path, small ones are decoded from memory
+    if isinstance(audio_data, str):
+        return AudioSegment.from_file(audio_data)
+    return AudioSegment.from_file(io.BytesIO(audio_data))
+
+
+def _audio_size(audio_data: Union[bytes, str]) -> int:
+    if isinstance(audio_data, str):
+        return os.path.getsize(audio_data)
+    return len(audio_data)
+
+
+def _describe_audio(audio: "AudioSegment") -> Dict[str, Any]:
+    return {
+        "duration": len(audio) / 1000,  # Convert to seconds
+        "channels": audio.channels,
+        "sample_width": audio.sample_width,
+        "frame_rate": audio.frame_rate,
+        "max_amplitude": audio.max,
+        "rms": audio.rms
+    }
+
+
+def _analyze_audio(audio_data: Union[bytes, str]) -> Dict[str, Any]:
+    # Runs in the CPU executor; only the small description is sent back
+    return _describe_audio(_decode_audio(audio_data))
 
 
 class VoiceProcessor:
     def __init__(self):
         self.api_key = settings.ASSEMBLYAI_API_KEY
-        aai.settings.api_key = self.api_key
+        self._aai = None
         self.supported_formats = ["wav", "mp3", "ogg"]
         self.max_duration = 300  # 5 minutes in seconds
         self.max_file_size = 100 * 1024 * 1024  # 100MB
 
     async def transcribe(
             self,
-            audio_data: bytes,
+            audio_data: Union[bytes, str],
             language: str = "en",
             enhance_audio: bool = False
     ) -> Dict[str, Any]:
         try:
-            # Validate audio before processing
-            validation = await self.validate_audio(audio_data)
+            audio_size = _audio_size(audio_data)
+            metrics.record_payload("voice", "audio_upload", audio_size)
+            if audio_size > self.max_file_size:
+                raise ValueError(self._size_error_message())
+
+            # Decode once, off the event loop, and share the result between
+            # validation and transcription
+            try:
+                with metrics.span("voice", "decode") as decode_span:
+                    audio_info = await cpu_executor.run(_analyze_audio, audio_data)
+            except Exception as e:
+                raise ValueError(f"Invalid audio file: {str(e)}")
+
+            with metrics.span("voice", "validate") as validate_span:
+                validation = await self.validate_audio(audio_data, audio_info=audio_info)
             if not validation["is_valid"]:
                 raise ValueError(validation["message"])
 
+            aai = self._assemblyai()
             transcriber = aai.Transcriber()
             config = aai.TranscriptionConfig(
                 language_code=language,
@@ -37,7 +87,12 @@ class VoiceProcessor:
                 sentiment_analysis=True
             )
 
-            result = await self._process_audio(audio_data, transcriber, config)
+            # The SDK uploads the original file and transcodes it server-side,
+            # so no converted copy is written: spooled uploads go by path,
+            # in-memory ones as a file object
+            audio_source = audio_data if isinstance(audio_data, str) else io.BytesIO(audio_data)
+            with metrics.upstream_span("assemblyai", "transcribe") as transcribe_span:
+                result = await self._process_audio(audio_source, transcriber, config)
 
             if not result:
                 raise ValueError("Transcription failed")
@@ -48,7 +103,13 @@ class VoiceProcessor:
                 "words": result.words,
                 "sentiment": result.sentiment_analysis,
                 "language": language,
-                "duration": result.audio_duration
+                "duration": result.audio_duration,
+                "audio_info": audio_info,
+                "timings": {
+                    "decode": decode_span.duration,
+                    "validate": validate_span.duration,
+                    "upstream": transcribe_span.duration
+                }
             }
 
         except Exception as e:
@@ -56,35 +117,26 @@ class VoiceProcessor:
 
     async def _process_audio(
             self,
-            audio_data: bytes,
-            transcriber: aai.Transcriber,
-            config: aai.TranscriptionConfig
-    ) -> Optional[aai.Transcript]:
+            audio_source: Union[str, BinaryIO],
+            transcriber: "aai.Transcriber",
+            config: "aai.TranscriptionConfig"
+    ) -> Optional["aai.Transcript"]:
         try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file.flush()
-
-                # Convert audio to compatible format if needed
-                audio = AudioSegment.from_file(temp_file.name)
-                if audio.frame_rate != 44100:
-                    audio = audio.set_frame_rate(44100)
-                audio.export(temp_file.name, format='wav')
-
-                # Process audio using AssemblyAI
-                transcript = await asyncio.to_thread(
-                    transcriber.transcribe,
-                    temp_file.name,
-                    config=config
-                )
-
-            os.unlink(temp_file.name)
-            return transcript
+            # Process audio using AssemblyAI
+            return await asyncio.to_thread(
+                transcriber.transcribe,
+                audio_source,
+                config=config
+            )
 
         except Exception as e:
             raise Exception(f"Audio Processing Error: {str(e)}")
 
-    async def validate_audio(self, audio_data: bytes) -> Dict[str, Any]:
+    async def validate_audio(
+            self,
+            audio_data: Union[bytes, str],
+            audio_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         validation_result = {
             "is_valid": True,
             "message": "Audio file is valid",
@@ -93,35 +145,31 @@ class VoiceProcessor:
 
         try:
             # Check file size
-            if len(audio_data) > self.max_file_size:
+            size = _audio_size(audio_data)
+            if size > self.max_file_size:
                 return {
                     "is_valid": False,
-                    "message": f"File size exceeds {self.max_file_size / 1024 / 1024}MB limit",
-                    "details": {"size": len(audio_data)}
+                    "message": self._size_error_message(),
+                    "details": {"size": size}
                 }
 
-            # Check audio format and duration
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file.flush()
-
-                audio = AudioSegment.from_file(temp_file.name)
-                duration = len(audio) / 1000  # Convert to seconds
+            # Check audio format and duration, reusing an earlier decode when given
+            if audio_info is None:
+                audio_info = await cpu_executor.run(_analyze_audio, audio_data)
 
-                validation_result["details"] = {
-                    "duration": duration,
-                    "channels": audio.channels,
-                    "sample_width": audio.sample_width,
-                    "frame_rate": audio.frame_rate
-                }
+            validation_result["details"] = {
+                "duration": audio_info["duration"],
+                "channels": audio_info["channels"],
+                "sample_width": audio_info["sample_width"],
+                "frame_rate": audio_info["frame_rate"]
+            }
 
-                if duration > self.max_duration:
-                    validation_result.update({
-                        "is_valid": False,
-                        "message": f"Audio duration exceeds {self.max_duration} seconds"
-                    })
+            if audio_info["duration"] > self.max_duration:
+                validation_result.update({
+                    "is_valid": False,
+                    "message": f"Audio duration exceeds {self.max_duration} seconds"
+                })
 
-            os.unlink(temp_file.name)
             return validation_result
 
         except Exception as e:
@@ -131,25 +179,27 @@ class VoiceProcessor:
                 "details": {}
             }
 
-    async def get_audio_info(self, audio_data: bytes) -> Dict[str, Any]:
+    async def get_audio_info(
+            self,
+            audio_data: Union[bytes, str],
+            audio_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file.flush()
-
-                audio = AudioSegment.from_file(temp_file.name)
-
-                info = {
-                    "duration": len(audio) / 1000,
-                    "channels": audio.channels,
-                    "sample_width": audio.sample_width,
-                    "frame_rate": audio.frame_rate,
-                    "max_amplitude": audio.max,
-                    "rms": audio.rms
-                }
-
-            os.unlink(temp_file.name)
-            return info
+            if audio_info is not None:
+                return audio_info
+            return await cpu_executor.run(_analyze_audio, audio_data)
 
         except Exception as e:
-            raise Exception(f"Error getting audio info: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error getting audio info: {str(e)}")
+
+    def _assemblyai(self):
+        # The SDK is heavy to import, so load and configure it on first transcription
+        if self._aai is None:
+            import assemblyai
+
+            assemblyai.settings.api_key = self.api_key
+            self._aai = assemblyai
+        return self._aai
+
+    def _size_error_message(self) -> str:
+        return f"File size exceeds {self.max_file_size / 1024 / 1024}MB limit"
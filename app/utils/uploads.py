@@ -0,0 +1,120 @@
+from typing import List, Optional, Union
+import asyncio
+import os
+import tempfile
+from fastapi import UploadFile
+from app.core.config import settings
+from app.utils.helpers import Helper
+from app.utils.validators import Validator
+
+# Enough leading bytes to recognise every signature in FILE_SIGNATURES
+SIGNATURE_BYTES = 16
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class UploadPayload:
+    """An ingested upload, held in memory or spooled to a temp file."""
+
+    def __init__(
+            self,
+            file_format: str,
+            size: int,
+            data: Optional[bytes] = None,
+            path: Optional[str] = None
+    ):
+        self.file_format = file_format
+        self.size = size
+        self.data = data
+        self.path = path
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        # Services accept either raw bytes or a file path
+        return self.path if self.path is not None else self.data
+
+    def close(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+        self.data = None
+
+
+async def read_upload(
+        file: UploadFile,
+        max_size: int,
+        allowed_formats: List[str],
+        chunk_size: Optional[int] = None,
+        spool_threshold: Optional[int] = None
+) -> UploadPayload:
+    """Read an upload in chunks, rejecting it as early as possible.
+
+    The format is sniffed from the leading bytes and the size limit is
+    enforced as chunks arrive, so bad uploads fail without being read in
+    full. Uploads larger than `spool_threshold` are written to a temp file
+    instead of being accumulated in memory.
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    spool_threshold = spool_threshold if spool_threshold is not None else settings.UPLOAD_SPOOL_THRESHOLD
+
+    buffer = bytearray()
+    spool = None
+    size = 0
+    file_format = None
+
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_size:
+                raise UploadRejected(
+                    413,
+                    f"File size exceeds {Helper.format_file_size(max_size)} limit"
+                )
+
+            if spool is None:
+                buffer.extend(chunk)
+                if file_format is None and len(buffer) >= SIGNATURE_BYTES:
+                    file_format = _check_signature(bytes(buffer[:SIGNATURE_BYTES]), allowed_formats)
+
+                if size > spool_threshold:
+                    spool = tempfile.NamedTemporaryFile(
+                        suffix=f".{file_format}",
+                        dir=settings.UPLOAD_SPOOL_DIR,
+                        delete=False
+                    )
+                    await asyncio.to_thread(spool.write, buffer)
+                    buffer = bytearray()
+            else:
+                await asyncio.to_thread(spool.write, chunk)
+
+        if size == 0:
+            raise UploadRejected(400, "Uploaded file is empty")
+        if file_format is None:
+            file_format = _check_signature(bytes(buffer[:SIGNATURE_BYTES]), allowed_formats)
+
+        if spool is not None:
+            spool.close()
+            return UploadPayload(file_format=file_format, size=size, path=spool.name)
+        return UploadPayload(file_format=file_format, size=size, data=bytes(buffer))
+
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+
+def _check_signature(header: bytes, allowed_formats: List[str]) -> str:
+    signature = Validator.validate_file_signature(header, allowed_formats)
+    if not signature["is_valid"]:
+        raise UploadRejected(415, signature["message"])
+    return signature["format"]
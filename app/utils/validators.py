@@ -3,6 +3,21 @@ import re
 from pathlib import Path
 
 
+# Leading bytes that identify the upload formats we accept
+FILE_SIGNATURES: List[Tuple[int, bytes, str]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"BM", "bmp"),
+    (0, b"II*\x00", "tiff"),
+    (0, b"MM\x00*", "tiff"),
+    (0, b"OggS", "ogg"),
+    (0, b"fLaC", "flac"),
+    (0, b"ID3", "mp3"),
+]
+
+
 class Validator:
     @staticmethod
     def validate_file_type(filename: str, allowed_extensions: List[str]) -> Dict[str, Any]:
@@ -66,4 +81,31 @@ class Validator:
         return {
             "is_valid": True,
             "message": "Valid CAD parameters"
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def detect_file_format(header: bytes) -> Optional[str]:
+        if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+            return "wav"
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return "webp"
+
+        for offset, signature, file_format in FILE_SIGNATURES:
+            if header[offset:offset + len(signature)] == signature:
+                return file_format
+
+        # MPEG audio frame sync without an ID3 tag
+        if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+            return "mp3"
+        return None
+
+    @staticmethod
+    def validate_file_signature(header: bytes, allowed_formats: List[str]) -> Dict[str, Any]:
+        file_format = Validator.detect_file_format(header)
+        is_valid = file_format is not None and file_format in allowed_formats
+        return {
+            "is_valid": is_valid,
+            "format": file_format,
+            "allowed": allowed_formats,
+            "message": f"Unsupported file content: {file_format or 'unknown'}" if not is_valid else "Valid file content"
+        }
@@ -0,0 +1,40 @@
+import time
+import pytest
+from app.services.cad_rules import DESIGN_RULES, CADRuleEngine
+
+ROUNDS = 20000
+VALUES = {"length": 100, "width": 50, "height": 25, "material": "aluminum", "tolerance": "0.1mm"}
+
+
+def format_every_time(design_type: str, values: dict) -> list:
+    # Reference: parse and format every template on every call
+    instructions = []
+    for _, template in DESIGN_RULES[design_type]:
+        try:
+            instructions.append(template.format(**values))
+        except KeyError:
+            pass
+    return instructions
+
+
+def rate(render) -> float:
+    started = time.perf_counter()
+    for index in range(ROUNDS):
+        render(index)
+    return ROUNDS / (time.perf_counter() - started)
+
+
+@pytest.mark.benchmark
+def test_memoized_rule_engine_throughput():
+    engine = CADRuleEngine(cache_size=ROUNDS)
+    assert engine.render("3D_MODEL", VALUES) == format_every_time("3D_MODEL", VALUES)
+
+    reference = rate(lambda index: format_every_time("3D_MODEL", {**VALUES, "length": index}))
+    misses = rate(lambda index: engine.render("3D_MODEL", {**VALUES, "length": index}))
+    hits = rate(lambda index: engine.render("3D_MODEL", {**VALUES, "notes": index}))
+
+    print(
+        f"\nformat every call: {reference:.0f} renders/s"
+        f"\nrule engine, miss: {misses:.0f} renders/s"
+        f"\nrule engine, hit:  {hits:.0f} renders/s"
+    )
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import pytest
+
+DEFERRED_MODULES = ("assemblyai", "pydub", "PIL")
+
+PROBE = f"""
+import sys
+import app.main
+from app.core.config import get_settings
+print(get_settings.cache_info().currsize)
+print(",".join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))
+"""
+
+
+def import_app() -> tuple:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=root, env=os.environ.copy(), capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative) / 1e6
+    settings_built, deferred_loaded = completed.stdout.splitlines()[-2:]
+    return timings, int(settings_built), deferred_loaded
+
+
+def test_app_import_defers_settings_and_heavy_sdks():
+    # Deterministic, so it runs with the unit tests
+    _, settings_built, deferred_loaded = import_app()
+
+    assert settings_built == 0
+    assert deferred_loaded == ""
+
+
+@pytest.mark.benchmark
+def test_app_import_time():
+    timings, _, _ = import_app()
+
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:8]
+    print("\nimport app.main: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in slowest))
@@ -0,0 +1,69 @@
+import asyncio
+import statistics
+import time
+import aiohttp
+import pytest
+from app.services.http_client import http_client_pool
+from app.services.llama_processor import LLaMAProcessor
+from tests.stub_server import StubServer
+
+REQUESTS = 200
+CONCURRENCY = 10
+
+
+def completion(_: dict) -> dict:
+    return {"choices": [{"text": "ok"}], "confidence": 0.9}
+
+
+def p99(latencies):
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+async def measure(call):
+    latencies = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(timed() for _ in range(REQUESTS)))
+    return latencies
+
+
+@pytest.mark.benchmark
+def test_pooled_session_reuses_connections_and_reports_p99():
+    async def run():
+        stub = await StubServer(completion, delay=0.002).start()
+        processor = LLaMAProcessor()
+        processor.base_url = stub.url
+
+        async def per_call_session():
+            # The pre-pool behaviour: a new session (and connection) per completion
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{stub.url}/completions", json={"prompt": "x"}) as response:
+                    await response.read()
+
+        try:
+            before = await measure(per_call_session)
+            before_connections = len(stub.connections)
+
+            stub.connections.clear()
+            await http_client_pool.start()
+            after = await measure(lambda: processor.process_query("x", use_cache=False))
+            after_connections = len(stub.connections)
+        finally:
+            await http_client_pool.close()
+            await stub.stop()
+        return before, before_connections, after, after_connections
+
+    before, before_connections, after, after_connections = asyncio.run(run())
+
+    print(
+        f"\nper-call session: p99 {p99(before) * 1000:.2f} ms over {before_connections} connections"
+        f"\npooled session:   p99 {p99(after) * 1000:.2f} ms over {after_connections} connections"
+    )
+    assert before_connections == REQUESTS
+    assert after_connections <= CONCURRENCY
@@ -0,0 +1,49 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.core.security import SecurityHandler
+
+LOGINS = 4
+TICK = 0.005
+
+
+async def login_burst(hash_password) -> tuple:
+    """Run LOGINS hashes concurrently; return (hashes/sec, max event-loop lag)."""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            lag = max(lag, time.perf_counter() - expected)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK)
+    started = time.perf_counter()
+    hashes = await asyncio.gather(*(hash_password(f"password-{index}") for index in range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+
+    assert all(SecurityHandler.verify_password(f"password-{index}", hashed) for index, hashed in enumerate(hashes))
+    return LOGINS / elapsed, lag
+
+
+async def blocking_hash(password: str) -> str:
+    # The pre-executor behaviour: hashing directly on the event loop
+    return SecurityHandler.get_password_hash(password)
+
+
+@pytest.mark.benchmark
+def test_async_hashing_event_loop_lag():
+    blocking_rate, blocking_lag = asyncio.run(login_burst(blocking_hash))
+    pooled_rate, pooled_lag = asyncio.run(login_burst(SecurityHandler.get_password_hash_async))
+
+    print(
+        f"\nbcrypt rounds={settings.BCRYPT_ROUNDS}, burst of {LOGINS} logins"
+        f"\non the loop:  {blocking_rate:.1f} hashes/s, max loop lag {blocking_lag * 1000:.1f} ms"
+        f"\nhash pool:    {pooled_rate:.1f} hashes/s, max loop lag {pooled_lag * 1000:.1f} ms"
+    )
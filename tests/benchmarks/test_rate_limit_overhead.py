@@ -0,0 +1,49 @@
+import asyncio
+import time
+import pytest
+from app.core.rate_limit import RateLimitMiddleware, RateLimiter
+
+REQUESTS = 20000
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+def scope(index: int) -> dict:
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/cad/generate",
+        "headers": [],
+        "client": (f"10.0.{index % 250}.{index % 100}", 1234)
+    }
+
+
+async def time_requests(app) -> float:
+    started = time.perf_counter()
+    for index in range(REQUESTS):
+        await app(scope(index), receive, send)
+    return (time.perf_counter() - started) / REQUESTS
+
+
+@pytest.mark.benchmark
+def test_local_bucket_middleware_overhead():
+    limiter = RateLimiter(capacity=10 ** 9, period=3600, route_costs={"/input/voice": 10})
+    middleware = RateLimitMiddleware(noop_app, limiter=limiter)
+
+    baseline = asyncio.run(time_requests(noop_app))
+    limited = asyncio.run(time_requests(middleware))
+    overhead = limited - baseline
+
+    print(f"\nrate limit middleware: {overhead * 1e6:.1f} us per request over {REQUESTS} requests")
+    assert limiter.stats()["allowed"] == REQUESTS
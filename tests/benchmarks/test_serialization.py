@@ -0,0 +1,60 @@
+import json
+import time
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.responses import FastJSONResponse
+from app.models.research_model import ResearchResult, ResearchSource
+
+ROUNDS = 200
+
+
+def large_result() -> ResearchResult:
+    return ResearchResult(
+        query="lightweight bracket materials",
+        results=[
+            ResearchSource(
+                title=f"Source {index}",
+                content="Aluminum alloys trade stiffness for weight. " * 100,
+                url=f"https://example.com/{index}",
+                relevance_score=0.5 + index / 100,
+                author="Research Team"
+            )
+            for index in range(50)
+        ],
+        summary="Summary of lightweight bracket materials and their trade-offs in production.",
+        keywords=["aluminum", "bracket", "weight"]
+    )
+
+
+def default_response(result: ResearchResult) -> bytes:
+    # FastAPI's default path: revalidate against response_model, encode, stdlib json
+    validated = ResearchResult.model_validate(result.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_response(result: ResearchResult) -> bytes:
+    return FastJSONResponse(result).body
+
+
+def throughput(render, result: ResearchResult) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        render(result)
+    return ROUNDS / (time.perf_counter() - started)
+
+
+@pytest.mark.benchmark
+def test_large_research_result_serialization_throughput():
+    result = large_result()
+    assert json.loads(fast_response(result)) == json.loads(default_response(result))
+
+    size_mb = len(fast_response(result)) / 1e6
+    default_rate = throughput(default_response, result)
+    fast_rate = throughput(fast_response, result)
+
+    print(
+        f"\nResearchResult with 50 sources ({size_mb:.2f} MB)"
+        f"\ndefault JSONResponse: {default_rate:.0f} responses/s ({default_rate * size_mb:.0f} MB/s)"
+        f"\nFastJSONResponse:     {fast_rate:.0f} responses/s ({fast_rate * size_mb:.0f} MB/s)"
+    )
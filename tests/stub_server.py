@@ -0,0 +1,46 @@
+from typing import Any, Callable, Dict, Optional, Union
+import asyncio
+from aiohttp import web
+
+
+class StubServer:
+    """Local aiohttp upstream that counts requests and connections.
+
+    `handler` maps the parsed JSON body to the JSON response, or to a
+    string sent as a Server-Sent Events body; `delay` simulates upstream
+    latency.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Union[Dict[str, Any], str]], delay: float = 0.0):
+        self.handler = handler
+        self.delay = delay
+        self.requests = 0
+        self.connections = set()
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        result = self.handler(body)
+        if isinstance(result, str):
+            return web.Response(text=result, content_type="text/event-stream")
+        return web.json_response(result)
+
+    async def start(self) -> "StubServer":
+        app = web.Application()
+        app.router.add_post("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import pytest
+from app.services import cad_batch
+from app.services.cad_batch import build_columns, expand_sweep, flatten_specifications, validate_columns
+
+
+def test_range_axes_include_stop_despite_float_error():
+    variants = expand_sweep({"length": {"start": 0.1, "stop": 0.3, "step": 0.1}}, max_variants=10)
+    assert variants == [{"length": 0.1}, {"length": 0.2}, {"length": 0.3}]
+
+
+def test_axes_expand_to_their_cartesian_product_in_order():
+    variants = expand_sweep(
+        {"length": {"start": 10, "stop": 20, "step": 10}, "material": ["steel", "aluminum"]},
+        max_variants=10
+    )
+    assert variants == [
+        {"length": 10, "material": "steel"},
+        {"length": 10, "material": "aluminum"},
+        {"length": 20, "material": "steel"},
+        {"length": 20, "material": "aluminum"}
+    ]
+
+
+def test_oversized_sweep_is_rejected_before_axes_are_built(monkeypatch):
+    materialized = []
+    monkeypatch.setattr(cad_batch, "_range_values", lambda *args: materialized.append(args))
+
+    with pytest.raises(ValueError, match="9900001 variants"):
+        expand_sweep({"length": {"start": 0, "stop": 99, "step": 1e-5}}, max_variants=50000)
+    assert materialized == []
+
+
+def test_product_of_small_axes_counts_against_the_limit():
+    sweep = {"length": list(range(100)), "width": list(range(100)), "height": list(range(100))}
+    with pytest.raises(ValueError, match="1000000 variants"):
+        expand_sweep(sweep, max_variants=50000)
+
+
+@pytest.mark.parametrize("axis, message", [
+    ({"start": 0, "stop": 1, "step": 0}, "step must be positive"),
+    ({"start": 0, "stop": float("inf"), "step": 1}, "must be finite"),
+    ({"start": 5, "stop": 1, "step": 1}, "has no values"),
+    ([], "has no values")
+])
+def test_invalid_axes_are_rejected(axis, message):
+    with pytest.raises(ValueError, match=message):
+        expand_sweep({"length": axis}, max_variants=100)
+
+
+def test_columns_fall_back_to_base_and_validate_per_variant():
+    base = flatten_specifications({
+        "dimensions": {"length": 100, "width": 50, "height": 25},
+        "material": "aluminum",
+        "tolerance": 0.1
+    })
+    variants = [{"length": 120}, {"width": -1}, {"height": "tall", "material": "steel"}]
+    columns = build_columns(base, variants)
+    errors = validate_columns(columns, len(variants))
+
+    assert errors[0] is None
+    assert "width must be a positive number" in errors[1]
+    assert "height must be a positive number" in errors[2]
+    assert columns["length"] == [120.0, 100.0, 100.0]
+    assert columns["material"] == ["aluminum", "aluminum", "steel"]
+    assert columns["tolerance"] == ["0.1", "0.1", "0.1"]
+
+
+def test_batch_endpoint_rejects_oversized_sweep(client):
+    response = client.post("/api/v1/cad/batch", json={
+        "design_type": "3D_MODEL",
+        "specifications": {"dimensions": {"length": 1, "width": 1, "height": 1}, "material": "steel"},
+        "sweep": {"length": {"start": 0, "stop": 99, "step": 0.00001}}
+    })
+    assert response.status_code == 400
+    assert "9900001 variants" in response.json()["error"]
+
+
+def test_batch_endpoint_counts_explicit_variants_against_the_limit(client, monkeypatch):
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "CAD_BATCH_MAX_VARIANTS", 3)
+    response = client.post("/api/v1/cad/batch", json={
+        "design_type": "3D_MODEL",
+        "specifications": {"dimensions": {"length": 1, "width": 1, "height": 1}, "material": "steel"},
+        "variants": [{"length": 2}, {"length": 3}],
+        "sweep": {"width": [1, 2]}
+    })
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_streams_results_in_order(client):
+    response = client.post("/api/v1/cad/batch", json={
+        "design_type": "3D_MODEL",
+        "specifications": {"dimensions": {"length": 1, "width": 1, "height": 1}, "material": "steel"},
+        "sweep": {"length": {"start": 10, "stop": 30, "step": 10}}
+    })
+    lines = [line for line in response.text.splitlines() if line]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["index"] for line in lines] == [0, 1, 2]
+
+
+def test_large_batch_yields_to_the_event_loop(monkeypatch):
+    from app.core.config import get_settings
+    from app.services.cad_processor import CADProcessor
+    monkeypatch.setattr(get_settings(), "CAD_BATCH_CHUNK_SIZE", 50)
+
+    async def run():
+        results = []
+        progress_seen = []
+
+        async def observer():
+            while True:
+                progress_seen.append(len(results))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(observer())
+        await asyncio.sleep(0)
+        async for item in CADProcessor().generate_batch(
+                "3D_MODEL",
+                {"dimensions": {"length": 1, "width": 1, "height": 1}, "material": "steel"},
+                [{"length": length} for length in range(1, 121)]
+        ):
+            results.append(item)
+        task.cancel()
+        return results, progress_seen
+
+    results, progress_seen = asyncio.run(run())
+    assert len(results) == 120
+    # Other tasks ran after the 50th and 100th variants
+    assert {50, 100} <= set(progress_seen)
+
+
+def test_large_batch_is_streamed_even_when_buffering_is_requested(client, monkeypatch):
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "CAD_BATCH_MAX_BUFFERED_VARIANTS", 2)
+    response = client.post("/api/v1/cad/batch", json={
+        "design_type": "3D_MODEL",
+        "specifications": {"dimensions": {"length": 1, "width": 1, "height": 1}, "material": "steel"},
+        "sweep": {"length": {"start": 10, "stop": 30, "step": 10}},
+        "stream": False
+    })
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len([line for line in response.text.splitlines() if line]) == 3
@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from app.api.routes.cad import CADJobRequest
+from app.core.config import get_settings
+from app.services.cad_optimizer import DesignOptimizer, MATERIALS, validate_materials
+from app.services.cad_processor import CADJob, CADProcessor
+from app.services.cpu_executor import cpu_executor
+
+SPECIFICATIONS = {
+    "dimensions": {"length": 100, "width": 50, "height": 25},
+    "material": "steel",
+    "wall_thickness": "3mm"
+}
+
+
+def optimize(optimizer=None, **kwargs):
+    optimizer = optimizer or DesignOptimizer(seed=1)
+    kwargs.setdefault("max_iterations", 5)
+    return asyncio.run(optimizer.optimize(SPECIFICATIONS, **kwargs))
+
+
+def test_optimized_design_is_feasible_and_no_worse():
+    result = optimize()
+    assert result["metrics"]["feasible"]
+    assert result["metrics"]["iterations"] == 5
+    assert result["optimized"]["mass_g"] <= result["original"]["mass_g"]
+    assert result["optimized"]["strength_index"] >= result["original"]["strength_index"]
+
+
+def test_search_is_deterministic_for_a_seed():
+    assert optimize()["specifications"] == optimize()["specifications"]
+
+
+def test_weight_limit_is_respected():
+    result = optimize(constraints={"max_weight": "50g"})
+    assert result["optimized"]["mass_g"] <= 50 or not result["metrics"]["feasible"]
+
+
+def test_candidate_materials_can_be_restricted():
+    result = optimize(constraints={"materials": ["steel", "Stainless Steel"]})
+    assert result["optimized"]["material"] in ("steel", "stainless_steel")
+
+
+def test_time_budget_stops_the_search():
+    result = optimize(time_budget=1e-9, max_iterations=1000)
+    assert result["metrics"]["stopped_by"] == "time_budget"
+
+
+@pytest.mark.parametrize("specifications, constraints", [
+    ({**SPECIFICATIONS, "material": "unobtainium"}, None),
+    (SPECIFICATIONS, {"materials": ["steel", "adamantium"]})
+])
+def test_unknown_materials_list_the_supported_ones(specifications, constraints):
+    with pytest.raises(ValueError) as error:
+        validate_materials(specifications, constraints)
+    assert all(name in str(error.value) for name in MATERIALS)
+
+
+def test_in_flight_batches_are_capped_across_optimizations(monkeypatch):
+    monkeypatch.setattr(get_settings(), "CAD_OPTIMIZER_MAX_INFLIGHT_BATCHES", 2)
+    monkeypatch.setattr(cpu_executor, "max_workers", 8)
+    in_flight = peak = 0
+    run = cpu_executor.run
+
+    async def counting_run(fn, *args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return await run(fn, *args)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(cpu_executor, "run", counting_run)
+
+    async def run_concurrently():
+        optimizer = DesignOptimizer(seed=1)
+        return await asyncio.gather(*(
+            optimizer.optimize(SPECIFICATIONS, max_iterations=3) for _ in range(3)
+        ))
+
+    results = asyncio.run(run_concurrently())
+    assert all(result["metrics"]["iterations"] == 3 for result in results)
+    assert peak == 2
+
+
+class RecordingOptimizer(DesignOptimizer):
+    def __init__(self):
+        super().__init__()
+        self.objectives = None
+
+    async def optimize(self, specifications, constraints=None, objectives=None, time_budget=None, max_iterations=None):
+        self.objectives = objectives
+        return await super().optimize(specifications, constraints, objectives, time_budget, max_iterations=2)
+
+
+def test_queued_optimize_jobs_use_the_requested_objectives():
+    objectives = {"material_usage": False, "manufacturing_cost": True, "structural_integrity": True}
+    request = CADJobRequest(
+        design_type="3D_MODEL",
+        specifications=SPECIFICATIONS,
+        optimize=True,
+        objectives=objectives
+    )
+
+    async def run():
+        processor = CADProcessor()
+        processor.optimizer = RecordingOptimizer()
+        job = CADJob(request=request.model_dump(exclude={"priority"}))
+        await processor._run_job(job)
+        return processor, job
+
+    processor, job = asyncio.run(run())
+    assert job.status == "completed", job.error
+    assert processor.optimizer.objectives == objectives
+    assert job.result.metadata["optimization_metrics"]["optimized"]
+
+
+def test_optimize_endpoint_accepts_the_legacy_body(client):
+    response = client.post("/api/v1/cad/optimize", json={
+        "instructions": ["Create base with height 25 and width 50"],
+        "parameters": {"material_usage": True, "production_time": True}
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["optimized_design"]["instructions"] == ["Create base with height 25 and width 50"]
+    assert body["optimization_metrics"]["optimized"] is False
+
+
+def test_optimize_endpoint_rejects_unknown_materials(client):
+    response = client.post("/api/v1/cad/optimize", json={
+        "design_type": "3D_MODEL",
+        "specifications": {**SPECIFICATIONS, "material": "unobtainium"}
+    })
+    assert response.status_code == 400
+    assert "supported materials: abs, aluminum" in response.json()["error"]
+
+
+def test_job_submission_rejects_unknown_materials(client):
+    response = client.post("/api/v1/cad/jobs", json={
+        "design_type": "3D_MODEL",
+        "specifications": {**SPECIFICATIONS, "material": "unobtainium"},
+        "optimize": True
+    })
+    assert response.status_code == 400
+
+
+def test_optimize_endpoint_runs_the_optimizer(client):
+    response = client.post("/api/v1/cad/optimize", json={
+        "design_type": "3D_MODEL",
+        "specifications": SPECIFICATIONS,
+        "time_budget": 0.5
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["optimization_metrics"]["optimized"]
+    assert body["optimized_design"]["properties"]["mass_g"] <= body["original_design"]["properties"]["mass_g"]
@@ -0,0 +1,189 @@
+import asyncio
+import pytest
+from app.services import cad_projects
+from app.services.cad_processor import CADProcessor, PROJECT_VERSION_ATTEMPTS
+from app.services.cad_projects import ProjectConflictError, ProjectState, ProjectStore
+from app.services.storage import MongoStorage, CAD_PROJECTS, DUPLICATE_KEY_ERROR
+
+SPECIFICATIONS = {
+    "dimensions": {"length": 100, "width": 50, "height": 20},
+    "material": "aluminum",
+    "tolerance": "0.1mm"
+}
+
+
+class DuplicateKeyError(Exception):
+    code = DUPLICATE_KEY_ERROR
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class ProjectCollection:
+    """cad_projects with its unique (project_id, version) index."""
+
+    def __init__(self):
+        self.documents = []
+        self.fail_writes = False
+
+    async def insert_one(self, document):
+        if self.fail_writes:
+            raise ConnectionError("MongoDB write failed")
+        for stored in self.documents:
+            if (stored["project_id"], stored["version"]) == (document["project_id"], document["version"]):
+                raise DuplicateKeyError("E11000 duplicate key error")
+        self.documents.append(dict(document))
+
+    def _matching(self, query):
+        return [dict(d) for d in self.documents if all(d.get(k) == v for k, v in query.items())]
+
+    async def find_one(self, query, projection=None):
+        matching = self._matching(query)
+        return matching[0] if matching else None
+
+    def find(self, query, projection=None):
+        return Cursor(self._matching(query))
+
+
+@pytest.fixture
+def project_storage(monkeypatch):
+    storage = MongoStorage()
+    storage.db = {CAD_PROJECTS: ProjectCollection()}
+    monkeypatch.setattr(cad_projects, "storage", storage)
+    return storage
+
+
+def test_versions_increment_and_patch_only_changed_groups(project_storage):
+    async def run():
+        processor = CADProcessor()
+        first = await processor.generate_incremental("bracket", "3D_MODEL", SPECIFICATIONS)
+        second = await processor.generate_incremental(
+            "bracket", "3D_MODEL", {**SPECIFICATIONS, "tolerance": "0.05mm"}
+        )
+        third = await processor.generate_incremental(
+            "bracket", "3D_MODEL", {**SPECIFICATIONS, "tolerance": "0.05mm", "material": "steel"}
+        )
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert [first["version"], second["version"], third["version"]] == [1, 2, 3]
+    assert first["full_regeneration"] and first["base_version"] is None
+    assert second["base_version"] == 1
+    assert second["changed_fields"] == ["tolerance"]
+    assert second["patch"]["groups"] == {
+        "finish": ["Apply tolerance: 0.05mm"]
+    }
+    assert third["changed_fields"] == ["material"]
+    assert list(third["patch"]["groups"]) == ["material"]
+    stored = project_storage.db[CAD_PROJECTS].documents
+    assert [document["version"] for document in stored] == [1, 2, 3]
+
+
+def test_base_version_diffs_against_the_requested_version(project_storage):
+    async def run():
+        processor = CADProcessor()
+        await processor.generate_incremental("bracket", "3D_MODEL", SPECIFICATIONS)
+        await processor.generate_incremental("bracket", "3D_MODEL", {**SPECIFICATIONS, "material": "steel"})
+        return await processor.generate_incremental(
+            "bracket", "3D_MODEL", {**SPECIFICATIONS, "tolerance": "0.05mm"}, base_version=1
+        )
+
+    result = asyncio.run(run())
+
+    assert result["version"] == 3
+    assert result["base_version"] == 1
+    assert result["changed_fields"] == ["tolerance"]
+    # Version 2's material change is not carried over from the latest version
+    assert result["state"].groups["material"] == ["Apply material: aluminum"]
+    assert list(result["patch"]["groups"]) == ["finish"]
+
+
+def test_latest_version_after_eviction_is_read_by_version(project_storage):
+    async def run():
+        store = ProjectStore(max_projects=1, max_versions=1)
+        await store.put(ProjectState("a", 1, "3D_MODEL", {}, {}, {}, [], []))
+        await store.put(ProjectState("a", 2, "3D_MODEL", {}, {}, {}, [], []))
+        # Evicts project "a" from memory
+        await store.put(ProjectState("b", 1, "3D_MODEL", {}, {}, {}, [], []))
+        # Oldest created_at last, so a created_at sort would return version 1
+        documents = project_storage.db[CAD_PROJECTS].documents
+        documents[0]["created_at"], documents[1]["created_at"] = documents[1]["created_at"], documents[0]["created_at"]
+        return await store.get("a"), await store.get("a", 1), store.misses
+
+    latest, first, misses = asyncio.run(run())
+
+    assert latest.version == 2
+    assert first.version == 1
+    assert misses == 2
+
+
+def test_concurrent_workers_never_reuse_a_version(project_storage):
+    async def run():
+        # Separate processors stand in for separate worker processes
+        worker_a, worker_b = CADProcessor(), CADProcessor()
+        await worker_a.generate_incremental("bracket", "3D_MODEL", SPECIFICATIONS)
+        await worker_b.generate_incremental("bracket", "3D_MODEL", {**SPECIFICATIONS, "material": "steel"})
+        # worker_a still caches version 1 as the latest and loses version 2
+        return await worker_a.generate_incremental(
+            "bracket", "3D_MODEL", {**SPECIFICATIONS, "material": "steel", "tolerance": "0.05mm"}
+        )
+
+    result = asyncio.run(run())
+
+    assert result["version"] == 3
+    assert result["base_version"] == 2
+    assert result["changed_fields"] == ["tolerance"]
+    stored = project_storage.db[CAD_PROJECTS].documents
+    assert sorted(document["version"] for document in stored) == [1, 2, 3]
+
+
+def test_persistent_conflicts_fail_the_request(project_storage, monkeypatch):
+    collection = project_storage.db[CAD_PROJECTS]
+    attempts = []
+
+    async def always_taken(document):
+        attempts.append(document["version"])
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+    monkeypatch.setattr(collection, "insert_one", always_taken)
+    processor = CADProcessor()
+
+    with pytest.raises(ProjectConflictError):
+        asyncio.run(processor.generate_incremental("bracket", "3D_MODEL", SPECIFICATIONS))
+    assert len(attempts) == PROJECT_VERSION_ATTEMPTS
+    assert processor.projects.stats()["versions"] == 0
+
+
+def test_failed_write_fails_the_request(project_storage, client, monkeypatch):
+    from app.api.deps import get_cad_processor
+
+    monkeypatch.setattr(get_cad_processor(), "projects", ProjectStore(max_projects=10, max_versions=10))
+    project_storage.db[CAD_PROJECTS].fail_writes = True
+
+    response = client.post(
+        "/api/v1/cad/projects/bracket/generate",
+        json={"design_type": "3D_MODEL", "specifications": SPECIFICATIONS}
+    )
+
+    assert response.status_code == 500
+    assert project_storage.write_errors == 1
+    assert get_cad_processor().projects.stats()["versions"] == 0
@@ -0,0 +1,77 @@
+import pytest
+from app.models.cad_model import CADParameters, DesignType
+from app.services.cad_rules import DESIGN_RULES, CADRuleEngine, parameter_values
+
+VALUES = {"length": 100, "width": 50, "height": 25, "material": "aluminum", "tolerance": "0.1mm"}
+
+
+def test_every_design_type_has_rules():
+    assert set(DESIGN_RULES) == {design_type.value for design_type in DesignType}
+
+
+def test_render_skips_templates_with_missing_fields():
+    instructions = CADRuleEngine().render("3D_MODEL", VALUES)
+    assert instructions == [
+        "Create base with height 25 and width 50",
+        "Extrude base to length 100",
+        "Apply material: aluminum",
+        "Apply tolerance: 0.1mm"
+    ]
+
+
+def test_render_groups_keeps_output_order():
+    groups = CADRuleEngine().render_groups("PROTOTYPE", {**VALUES, "process": "FDM"})
+    assert list(groups) == ["body", "process", "finish"]
+    assert groups["process"] == ["Prepare for FDM fabrication"]
+
+
+def test_unrelated_fields_share_a_memo_entry():
+    engine = CADRuleEngine()
+    engine.render("3D_MODEL", {**VALUES, "notes": "first"})
+    engine.render("3D_MODEL", {**VALUES, "notes": "second"})
+    engine.render("3D_MODEL", {**VALUES, "tolerance": "0.2mm"})
+    cache = engine.stats()["cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 2)
+
+
+def test_cached_instructions_are_not_shared_with_callers():
+    engine = CADRuleEngine()
+    engine.render("3D_MODEL", VALUES).append("mutated")
+    assert "mutated" not in engine.render("3D_MODEL", VALUES)
+
+
+def test_affected_groups_follow_template_fields():
+    rule_set = CADRuleEngine().rule_set("ASSEMBLY")
+    assert rule_set.affected_groups({"components"}) == ["components"]
+    assert rule_set.affected_groups({"length"}) == ["envelope", "verification"]
+    assert rule_set.affected_groups({"unused"}) == []
+
+
+def test_unknown_design_type_is_rejected():
+    with pytest.raises(ValueError):
+        CADRuleEngine().render("SCULPTURE", VALUES)
+
+
+def test_parameter_values_flattens_dimensions_and_specifications():
+    parameters = CADParameters(
+        dimensions={"length": 1.0, "width": 2.0, "height": 3.0},
+        material="steel",
+        specifications={"tolerance": "0.1mm"}
+    )
+    assert parameter_values(parameters) == {
+        "length": 1.0, "width": 2.0, "height": 3.0, "material": "steel", "tolerance": "0.1mm"
+    }
+
+
+def test_equal_values_of_different_types_are_rendered_separately():
+    engine = CADRuleEngine()
+    assert engine.render("3D_MODEL", {**VALUES, "length": 100})[1] == "Extrude base to length 100"
+    assert engine.render("3D_MODEL", {**VALUES, "length": 100.0})[1] == "Extrude base to length 100.0"
+
+
+def test_unhashable_values_are_memoized_by_text():
+    engine = CADRuleEngine()
+    values = {**VALUES, "components": ["bolt", "nut"]}
+    assert "Insert components: ['bolt', 'nut']" in engine.render("ASSEMBLY", values)
+    assert engine.render("ASSEMBLY", values) == engine.render("ASSEMBLY", dict(values))
+    assert engine.stats()["cache"]["hits"] == 2
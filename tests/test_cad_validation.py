@@ -0,0 +1,77 @@
+import pytest
+from app.services.cad_validation import MAX_INSTRUCTION_LENGTH, ValidationEngine
+
+VALID = ["Create base with height 25 and width 50", "Extrude base to length 100"]
+LONG = "Create " + "x" * MAX_INSTRUCTION_LENGTH
+
+
+def test_valid_instructions_pass_every_level():
+    engine = ValidationEngine()
+    for level in ("QUICK", "STANDARD", "DETAILED"):
+        assert engine.validate(VALID, level).is_valid
+
+
+def test_max_length_only_runs_from_standard():
+    engine = ValidationEngine()
+    assert engine.validate(VALID + [LONG], "QUICK").is_valid
+    assert not engine.validate(VALID + [LONG], "STANDARD").is_valid
+
+
+def test_detailed_adds_warnings_without_invalidating():
+    result = ValidationEngine().validate(VALID + ["Make it pretty", VALID[0]], "DETAILED")
+    assert result.is_valid
+    assert result.metrics["warnings"] == 2
+    assert "Instruction does not start with a known CAD operation (instruction 3)" in result.details
+    assert "Duplicate instruction detected (instruction 4)" in result.details
+
+
+def test_quick_fails_fast_at_the_first_error():
+    instructions = ["", "Extrude base to length -5", ""]
+    quick = ValidationEngine().validate(instructions, "QUICK")
+    assert quick.metrics["stopped_early"]
+    assert quick.metrics["errors"] == 1
+    assert quick.metrics["rules_evaluated"] == 1
+
+    full = ValidationEngine().validate(instructions, "QUICK", fail_fast=False)
+    assert full.metrics["errors"] == 3
+    assert not full.metrics["stopped_early"]
+
+
+def test_duplicate_rule_state_does_not_leak_between_runs():
+    engine = ValidationEngine()
+    engine.validate(VALID, "DETAILED")
+    assert engine.validate(VALID, "DETAILED").metrics["warnings"] == 0
+
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        ValidationEngine().validate(VALID, "EXHAUSTIVE")
+
+
+def validate(client, instructions, **params):
+    return client.post(
+        "/api/v1/cad/validate",
+        params=params,
+        json={"design_type": "3D_MODEL", "instructions": instructions}
+    )
+
+
+def test_validate_endpoint_applies_the_requested_level(client):
+    standard = validate(client, VALID + [LONG], validation_level="STANDARD")
+    quick = validate(client, VALID + [LONG], validation_level="QUICK")
+
+    assert standard.status_code == quick.status_code == 200
+    assert not standard.json()["is_valid"]
+    assert standard.json()["metrics"]["validation_level"] == "STANDARD"
+    assert f"Instruction exceeds {MAX_INSTRUCTION_LENGTH} characters (instruction 3)" in standard.json()["validation_details"]
+    assert quick.json()["is_valid"]
+
+
+def test_validate_endpoint_honours_fail_fast(client):
+    body = validate(client, ["", ""], validation_level="DETAILED", fail_fast=True).json()
+    assert body["metrics"]["stopped_early"]
+    assert body["metrics"]["errors"] == 1
+
+
+def test_validate_endpoint_rejects_unknown_levels(client):
+    assert validate(client, VALID, validation_level="EXHAUSTIVE").status_code == 422
@@ -0,0 +1,16 @@
+def parse_server_timing(header: str) -> dict:
+    timings = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        timings[name] = float(duration)
+    return timings
+
+
+def test_text_input_total_covers_post_processing(client):
+    response = client.post("/api/v1/input/text", json={"content": "Design a cylindrical component"})
+    assert response.status_code == 200
+
+    timings = parse_server_timing(response.headers["server-timing"])
+    assert list(timings) == ["validate", "post_process", "total"]
+    assert timings["total"] >= timings["validate"] + timings["post_process"]
+    assert round(response.json()["processing_duration"] * 1000, 2) == timings["total"]
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import httpx
+from app.api.deps import get_llama_processor
+from app.services.cache import get_llama_response_cache
+from app.services.http_client import http_client_pool
+from app.services.llama_processor import LLaMAProcessor
+from tests.stub_server import StubServer
+
+
+def completion(body: dict) -> dict:
+    return {"choices": [{"text": f"analysis at {body['temperature']}"}], "confidence": 0.8}
+
+
+async def count_upstream_calls(call) -> int:
+    stub = await StubServer(completion).start()
+    processor = LLaMAProcessor()
+    processor.base_url = stub.url
+    get_llama_response_cache().local.clear()
+    try:
+        for _ in range(3):
+            await call(processor)
+    finally:
+        await http_client_pool.close()
+        await stub.stop()
+    return stub.requests
+
+
+def test_sampled_analysis_is_not_cached_by_default():
+    calls = asyncio.run(count_upstream_calls(
+        lambda processor: processor.analyze_cad_requirements("bracket 10x20mm")
+    ))
+    assert calls == 3
+
+
+def test_sampled_analysis_is_cached_when_requested():
+    calls = asyncio.run(count_upstream_calls(
+        lambda processor: processor.analyze_cad_requirements("bracket 10x20mm", use_cache=True)
+    ))
+    assert calls == 1
+
+
+def test_deterministic_completion_is_cached_by_default():
+    calls = asyncio.run(count_upstream_calls(
+        lambda processor: processor.process_query("bracket 10x20mm", temperature=0.0)
+    ))
+    assert calls == 1
+
+
+def streamed_completion(body: dict) -> str:
+    chunks = [{"choices": [{"text": token}], "confidence": 0.8} for token in ("aluminum ", "bracket")]
+    return "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+
+def test_repeated_analysis_request_is_served_from_the_cache(monkeypatch):
+    from app.core.rate_limit import rate_limiter
+    from app.main import app
+
+    async def run():
+        stub = await StubServer(streamed_completion).start()
+        monkeypatch.setattr(get_llama_processor(), "base_url", stub.url)
+        get_llama_response_cache().local.clear()
+        rate_limiter._local_buckets.clear()
+        # One event loop for the app, the pooled session and the stub upstream
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                bodies = []
+                for _ in range(2):
+                    response = await client.post(
+                        "/api/v1/cad/analyze/stream", json={"text": "bracket 10x20mm"}
+                    )
+                    bodies.append(response.text)
+        finally:
+            await http_client_pool.close()
+            await stub.stop()
+        return stub.requests, bodies
+
+    requests, (first, second) = asyncio.run(run())
+
+    assert requests == 1
+    assert '"analysis": "aluminum bracket"' in first
+    assert '"analysis": "aluminum bracket"' in second
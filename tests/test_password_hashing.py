@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import get_settings
+from app.core.security import SecurityHandler, get_pwd_context, password_hash_pool
+
+
+@pytest.fixture
+def fast_bcrypt(monkeypatch):
+    # Minimum cost, and more callers than permits so the semaphore has to wait
+    monkeypatch.setattr(get_settings(), "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(get_settings(), "PASSWORD_HASH_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(get_settings(), "MONGODB_SERVER_SELECTION_TIMEOUT_MS", 100)
+    get_pwd_context.cache_clear()
+    yield
+    get_pwd_context.cache_clear()
+
+
+async def hash_and_verify() -> list:
+    hashes = await asyncio.gather(*(SecurityHandler.get_password_hash_async(f"secret-{i}") for i in range(4)))
+    return await asyncio.gather(*(
+        SecurityHandler.verify_password_async(f"secret-{i}", hashed) for i, hashed in enumerate(hashes)
+    ))
+
+
+def test_hashing_works_across_app_restarts(fast_bcrypt):
+    from app.main import app
+
+    # Each TestClient runs the lifespan on its own event loop
+    for _ in range(2):
+        with TestClient(app) as client:
+            assert password_hash_pool.is_started
+            assert client.portal.call(hash_and_verify) == [True] * 4
+        assert not password_hash_pool.is_started
+
+
+def test_lazy_pool_serves_separate_event_loops(fast_bcrypt):
+    try:
+        assert asyncio.run(hash_and_verify()) == [True] * 4
+        assert asyncio.run(hash_and_verify()) == [True] * 4
+    finally:
+        asyncio.run(password_hash_pool.shutdown())
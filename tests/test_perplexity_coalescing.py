@@ -0,0 +1,57 @@
+import asyncio
+from app.services.http_client import http_client_pool
+from app.services.perplexity_client import PerplexityClient
+from tests.stub_server import StubServer
+
+
+def research(body: dict) -> dict:
+    return {
+        "results": [{"title": "Bracket design", "content": f"Findings for {body['query']}", "score": 0.9}],
+        "keywords": ["bracket"]
+    }
+
+
+async def run_queries(queries, max_results=5):
+    stub = await StubServer(research, delay=0.05).start()
+    client = PerplexityClient()
+    client.base_url = stub.url
+    try:
+        results = await asyncio.gather(*(
+            client.research_query(query, max_results=max_results) for query in queries
+        ))
+    finally:
+        await http_client_pool.close()
+        await stub.stop()
+    return stub.requests, results
+
+
+def test_identical_concurrent_queries_share_one_upstream_call():
+    calls, results = asyncio.run(run_queries(["aluminum bracket"] * 20))
+    assert calls == 1
+    assert all(result.results[0].title == "Bracket design" for result in results)
+
+
+def test_coalesced_callers_get_their_own_query_back():
+    queries = ["Aluminum Bracket", "aluminum  bracket", "ALUMINUM BRACKET"]
+    calls, results = asyncio.run(run_queries(queries))
+    assert calls == 1
+    assert [result.query for result in results] == queries
+
+
+def test_different_parameters_are_not_coalesced():
+    async def run():
+        stub = await StubServer(research, delay=0.05).start()
+        client = PerplexityClient()
+        client.base_url = stub.url
+        try:
+            await asyncio.gather(
+                client.research_query("aluminum bracket", max_results=5),
+                client.research_query("aluminum bracket", max_results=10),
+                client.research_query("steel bracket", max_results=5)
+            )
+        finally:
+            await http_client_pool.close()
+            await stub.stop()
+        return stub.requests
+
+    assert asyncio.run(run()) == 3
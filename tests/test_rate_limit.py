@@ -0,0 +1,89 @@
+import asyncio
+from app.core.rate_limit import RateLimiter, rate_limiter
+
+
+def limiter() -> RateLimiter:
+    return RateLimiter(capacity=10, period=10, route_costs={"/input/voice": 10, "/input": 3})
+
+
+def test_bucket_rejects_once_capacity_is_spent():
+    async def run():
+        rate = limiter()
+        decisions = [await rate.hit("ip:1", 1) for _ in range(11)]
+        return rate, decisions
+
+    rate, decisions = asyncio.run(run())
+    assert [decision.allowed for decision in decisions] == [True] * 10 + [False]
+    assert decisions[-1].retry_after > 0
+    assert rate.stats()["rejected"] == 1
+
+
+def test_clients_have_separate_buckets():
+    async def run():
+        rate = limiter()
+        for _ in range(10):
+            await rate.hit("ip:1", 1)
+        return await rate.hit("ip:2", 1)
+
+    assert asyncio.run(run()).allowed
+
+
+def test_route_costs_use_the_longest_prefix():
+    rate = limiter()
+    assert rate.cost_for("/api/v1/input/voice") == 10
+    assert rate.cost_for("/api/v1/input/text") == 3
+    assert rate.cost_for("/api/v1/cad/generate") == 1
+
+
+def test_route_costs_can_be_limited_to_one_method():
+    rate = RateLimiter(capacity=10, period=10, route_costs={"POST /cad/jobs": 5, "/cad": 2})
+    assert rate.cost_for("/api/v1/cad/jobs", "POST") == 5
+    # Polling a job stays cheap
+    assert rate.cost_for("/api/v1/cad/jobs/abc", "GET") == 2
+
+
+def small_bucket(monkeypatch, capacity: int) -> None:
+    monkeypatch.setattr(rate_limiter, "capacity", capacity)
+    monkeypatch.setattr(rate_limiter, "refill_rate", capacity / 3600)
+
+
+def test_one_batch_cannot_spend_more_than_a_bucket(client, monkeypatch):
+    from app.api.deps import get_perplexity_client
+
+    small_bucket(monkeypatch, 10)
+    queries = []
+
+    async def research_query(**kwargs):
+        queries.append(kwargs["query"])
+        raise AssertionError("batch should be rejected before any query runs")
+
+    monkeypatch.setattr(get_perplexity_client(), "research_query", research_query)
+
+    # 6 queries at 2 tokens each cost more than the 10-token bucket
+    response = client.post(
+        "/api/v1/research/batch",
+        json={"requests": [{"query": f"fastener standard {index}"} for index in range(6)]}
+    )
+
+    assert response.status_code == 400
+    assert "rate limit" in response.json()["error"]
+    assert queries == []
+
+
+def test_batch_variants_are_charged_against_the_shared_bucket(client, monkeypatch):
+    small_bucket(monkeypatch, 10)
+    batch = {
+        "design_type": "3D_MODEL",
+        "specifications": {"dimensions": {"length": 10, "width": 5, "height": 2}, "material": "steel"},
+        "sweep": {"length": {"start": 10, "stop": 49, "step": 1}},
+        "stream": False
+    }
+
+    # 1 token for the route and 0.1 per variant: 40 variants cost 5 tokens
+    responses = [client.post("/api/v1/cad/batch", json=batch) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert int(responses[-1].headers["retry-after"]) > 0
+    assert client.post("/api/v1/cad/generate", json={
+        "design_type": "3D_MODEL", "specifications": batch["specifications"]
+    }).status_code == 429
@@ -0,0 +1,71 @@
+from fastapi.routing import APIRoute
+from app.main import app
+
+EXPECTED_ROUTES = {
+    ("POST", "/api/v1/cad/generate"),
+    ("POST", "/api/v1/cad/batch"),
+    ("POST", "/api/v1/cad/projects/{project_id}/generate"),
+    ("GET", "/api/v1/cad/projects/{project_id}"),
+    ("GET", "/api/v1/cad/instructions"),
+    ("POST", "/api/v1/cad/jobs"),
+    ("GET", "/api/v1/cad/jobs/{job_id}"),
+    ("GET", "/api/v1/cad/jobs/{job_id}/result"),
+    ("POST", "/api/v1/cad/analyze/stream"),
+    ("POST", "/api/v1/cad/validate"),
+    ("GET", "/api/v1/cad/templates/{design_type}"),
+    ("POST", "/api/v1/cad/optimize"),
+    ("GET", "/api/v1/cad/compatibility"),
+    ("POST", "/api/v1/research/query"),
+    ("POST", "/api/v1/research/batch"),
+    ("GET", "/api/v1/research/history"),
+    ("POST", "/api/v1/input/text"),
+    ("POST", "/api/v1/input/voice"),
+    ("POST", "/api/v1/input/image"),
+}
+
+
+def route_table():
+    return [
+        (method, route.path, route.endpoint)
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    ]
+
+
+def test_route_modules_are_mounted():
+    registered = {(method, path) for method, path, _ in route_table()}
+    assert EXPECTED_ROUTES <= registered
+
+
+def test_every_path_has_a_single_handler():
+    handlers = {}
+    for method, path, endpoint in route_table():
+        handlers.setdefault((method, path), set()).add(endpoint.__module__)
+    duplicated = {key: modules for key, modules in handlers.items() if len(modules) > 1}
+    assert not duplicated
+
+
+def test_no_baseline_stub_handlers_remain():
+    modules = {endpoint.__module__ for _, _, endpoint in route_table()}
+    assert "app.api.endpoints" not in modules
+
+
+def test_generate_rejects_unknown_design_types(client):
+    response = client.post(
+        "/api/v1/cad/generate",
+        json={"design_type": "3D Model", "specifications": {"material": "steel"}}
+    )
+    assert response.status_code == 422
+    assert "Invalid design type" in response.text
+
+
+def test_research_query_accepts_the_original_body():
+    from app.api.routes.research import ResearchRequest
+
+    request = ResearchRequest.model_validate({
+        "query": "fastener standards",
+        "context": {"industry": "automotive"},
+        "filters": {"source_type": ["academic"]}
+    })
+    assert request.filter == {"source_type": ["academic"]}
+    assert request.context == "industry: automotive"
@@ -0,0 +1,87 @@
+import asyncio
+from app.core.config import get_settings
+from app.services.storage import MongoStorage
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Yield like a real round trip so overlapping flushes would show up
+        await asyncio.sleep(0.001)
+        self.batches.append(documents)
+        self.in_flight -= 1
+
+
+class RecordingDatabase(dict):
+    def __missing__(self, name):
+        self[name] = RecordingCollection()
+        return self[name]
+
+
+def connected_storage() -> MongoStorage:
+    storage = MongoStorage()
+    storage.db = RecordingDatabase()
+    return storage
+
+
+def test_full_buffer_drops_oldest_documents(monkeypatch):
+    monkeypatch.setattr(get_settings(), "STORAGE_FLUSH_SIZE", 10 ** 9)
+    monkeypatch.setattr(get_settings(), "STORAGE_MAX_BUFFER", 5)
+    storage = connected_storage()
+
+    for index in range(8):
+        storage.save("cad_jobs", {"index": index})
+    asyncio.run(storage.flush())
+
+    assert storage.dropped == 3
+    assert storage.db["cad_jobs"].batches == [[{"index": index} for index in range(3, 8)]]
+    assert storage.stats()["buffered"] == {"cad_jobs": 0}
+
+
+def test_buffer_flushes_at_flush_size(monkeypatch):
+    monkeypatch.setattr(get_settings(), "STORAGE_FLUSH_SIZE", 4)
+
+    async def run():
+        storage = connected_storage()
+        for index in range(10):
+            storage.save("cad_jobs", {"index": index})
+        while storage._scheduled_flushes:
+            await asyncio.gather(*storage._scheduled_flushes.values())
+        await storage.flush()
+        return storage
+
+    storage = asyncio.run(run())
+    written = [document["index"] for batch in storage.db["cad_jobs"].batches for document in batch]
+    assert written == list(range(10))
+    assert storage.written == 10
+
+
+def test_save_burst_keeps_one_flush_in_flight(monkeypatch):
+    monkeypatch.setattr(get_settings(), "STORAGE_FLUSH_SIZE", 4)
+
+    async def run():
+        storage = connected_storage()
+        for index in range(20):
+            storage.save("cad_jobs", {"index": index})
+        scheduled = len(storage._scheduled_flushes)
+        for index in range(20, 40):
+            storage.save("cad_jobs", {"index": index})
+            # Saves during a running flush queue up behind it
+            await asyncio.sleep(0)
+        while storage._scheduled_flushes:
+            await asyncio.gather(*storage._scheduled_flushes.values())
+        await storage.flush()
+        return storage, scheduled
+
+    storage, scheduled = asyncio.run(run())
+    collection = storage.db["cad_jobs"]
+    written = [document["index"] for batch in collection.batches for document in batch]
+    assert scheduled == 1
+    assert collection.max_in_flight == 1
+    assert written == list(range(40))